@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""
+Persistent (C0) vs volatile (C2) write latency
+----------------------------------------------
+Measures how long set_parameters takes with persist=True (C0, saved to flash)
+and persist=False (C2, applied until the next reset).
+
+Both runs happen inside one config session so the numbers only contain the
+write itself, not the mode switch. The channel is alternated on every write so
+that each call really sends a command to the module.
+
+Without --port the benchmark runs against the simulated module, which models
+the flash write as extra latency on C0 (see --sim-flash-latency).
+
+Usage:
+    python benchmarks/bench_volatile_write.py --iterations 50
+    python benchmarks/bench_volatile_write.py --port /dev/ttyUSB0 --iterations 50
+
+Note: every persistent write is a flash write on real hardware.
+"""
+
+import argparse
+import sys
+import logging
+
+from common import summarize, time_calls, write_results
+
+from e32_configurator import E32Module
+from e32_simulator import SimulatedE32
+
+
+def time_writes(module, iterations, persist):
+    """Time iterations calls to set_parameters and return the latencies in milliseconds"""
+    return time_calls(lambda i: module.set_parameters({"chan": 0x10 + (i % 2)}, persist=persist), iterations)
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Compare C0 and C2 write latency")
+    parser.add_argument("--port", help="Serial port of the module (default: start a simulated module)")
+    parser.add_argument("--baudrate", type=int, default=9600, help="Serial baudrate (default: 9600)")
+    parser.add_argument("--iterations", type=int, default=20, help="Writes per mode (default: 20)")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    parser.add_argument("--sim-latency", type=float, default=0.005,
+                        help="Simulated response latency in seconds (default: 0.005)")
+    parser.add_argument("--sim-flash-latency", type=float, default=0.025,
+                        help="Simulated extra latency of a flash write in seconds (default: 0.025)")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.WARNING)
+
+    simulator = None
+    if not args.port:
+        simulator = SimulatedE32(response_latency=args.sim_latency,
+                                 flash_write_latency=args.sim_flash_latency).start()
+        args.port = simulator.port
+
+    module = E32Module(port=args.port, baudrate=args.baudrate, manual_config=True)
+    if not module.connect():
+        if simulator:
+            simulator.close()
+        return 1
+
+    try:
+        with module.config_session() as ready:
+            if not ready:
+                print("Module is not in configuration mode", file=sys.stderr)
+                return 1
+
+            original = module.get_parameters()
+            results = {
+                "port": args.port,
+                "simulated": simulator is not None,
+                "persistent_c0": summarize(time_writes(module, args.iterations, persist=True)),
+                "volatile_c2": summarize(time_writes(module, args.iterations, persist=False)),
+            }
+
+            # Put the original channel back (and in flash)
+            if original:
+                module.set_parameters({"chan": original["chan"]})
+    finally:
+        module.disconnect()
+        if simulator:
+            simulator.close()
+
+    write_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
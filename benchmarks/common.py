@@ -0,0 +1,50 @@
+"""
+Shared helpers for the benchmark scripts
+"""
+
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+
+def percentile(samples, pct):
+    """Return the pct-th percentile of samples (nearest-rank)"""
+    ordered = sorted(samples)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100.0 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def summarize(samples):
+    """Summarize latency samples (milliseconds) as count, p50/p95/p99 and mean"""
+    if not samples:
+        return {"count": 0}
+    return {
+        "count": len(samples),
+        "p50_ms": round(percentile(samples, 50), 3),
+        "p95_ms": round(percentile(samples, 95), 3),
+        "p99_ms": round(percentile(samples, 99), 3),
+        "mean_ms": round(sum(samples) / len(samples), 3),
+    }
+
+
+def time_calls(func, iterations):
+    """Call func iterations times and return the latency of each call in milliseconds
+    func receives the iteration number; a falsy return value counts as a failure."""
+    samples = []
+    for i in range(iterations):
+        start = time.perf_counter()
+        if not func(i):
+            raise RuntimeError(f"{getattr(func, '__name__', 'call')} failed on iteration {i}")
+        samples.append((time.perf_counter() - start) * 1000.0)
+    return samples
+
+
+def write_results(results, output=None):
+    """Print results as JSON and save them to output if given"""
+    print(json.dumps(results, indent=4))
+    if output:
+        with open(output, "w") as f:
+            json.dump(results, f, indent=4)
@@ -0,0 +1,260 @@
+#!/usr/bin/env python3
+"""
+E32Module benchmark suite
+-------------------------
+Drives E32Module through its public API against simulated modules (see
+e32_simulator.py) and reports p50/p95/p99 latencies as JSON:
+
+    - get_parameters, set_parameters, version and reset_module per call
+    - config mode probe (enter_config_mode)
+    - mode switch (set_mode) through simulated GPIO, waiting for AUX or
+      sleeping the fixed delay used when AUX is not wired
+    - send throughput through a pair of linked simulated modules, unpaced
+      (write_data) and paced (send_stream), counting only delivered bytes
+    - sustained throughput of the transmit queue (queue_data), paced by AUX
+      or by the air rate model, against the air data rate and with host loss
+    - receive latency and throughput from the simulated air link (read_data)
+
+Usage:
+    python benchmarks/run_benchmarks.py
+    python benchmarks/run_benchmarks.py --only config probe --iterations 200 -o results.json
+"""
+
+import argparse
+import io
+import sys
+import threading
+import time
+import logging
+
+from common import summarize, time_calls, write_results
+
+from e32_configurator import E32Module, ModuleMode
+from e32_simulator import SimulatedE32, SimulatedGPIO, SUB_PACKET_SIZE
+
+# Registers used for the data path benchmarks: 9600 8N1, 19.2k air rate, channel 23
+FAST_AIR_REGISTERS = bytes([0x00, 0x00, 0x1D, 0x17, 0x44])
+
+BENCHMARKS = ["config", "probe", "mode-switch", "send", "tx-queue", "receive"]
+
+
+def connect(simulator):
+    """Open an E32Module on a simulator's port"""
+    module = E32Module(port=simulator.port, manual_config=True)
+    if not module.connect():
+        raise RuntimeError(f"Cannot open {simulator.port}")
+    return module
+
+
+def read_bytes(module, length, timeout):
+    """Read up to length bytes with read_data, giving up after timeout seconds"""
+    received = bytearray()
+    deadline = time.monotonic() + timeout
+    while len(received) < length:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        received += module.read_data(timeout=remaining, max_bytes=length - len(received))
+    return received
+
+
+def bench_config(args):
+    """Per-call latency of the configuration commands"""
+    with SimulatedE32(response_latency=args.sim_latency) as sim:
+        module = connect(sim)
+        try:
+            return {
+                "get_parameters": summarize(time_calls(lambda i: module.get_parameters(), args.iterations)),
+                "set_parameters": summarize(time_calls(
+                    lambda i: module.set_parameters({"chan": 0x10 + (i % 2)}, persist=False), args.iterations)),
+                "version": summarize(time_calls(lambda i: module.version(), args.iterations)),
+                "reset_module": summarize(time_calls(lambda i: module.reset_module(), args.reset_iterations)),
+            }
+        finally:
+            module.disconnect()
+
+
+def bench_probe(args):
+    """Cost of the configuration mode probe"""
+    with SimulatedE32(response_latency=args.sim_latency) as sim:
+        module = connect(sim)
+        try:
+            return {"enter_config_mode": summarize(time_calls(lambda i: module.enter_config_mode(), args.iterations))}
+        finally:
+            module.disconnect()
+
+
+def bench_mode_switch(args):
+    """Cost of switching between normal and configuration mode, with and without AUX"""
+    modes = [ModuleMode.NORMAL, ModuleMode.CONFIGURATION]
+    results = {"sim_mode_switch_ms": args.sim_mode_switch * 1000}
+    for name, aux_pin in (("aux", 22), ("fixed_delay", None)):
+        with SimulatedE32(mode_switch_time=args.sim_mode_switch) as sim:
+            gpio = SimulatedGPIO(sim, m0_pin=17, m1_pin=27, aux_pin=22)
+            module = E32Module(port=sim.port, m0_pin=17, m1_pin=27, aux_pin=aux_pin, gpio_backend=gpio)
+            if not module.connect():
+                raise RuntimeError(f"Cannot open {sim.port}")
+            try:
+                # probe=False: time the pin change itself, not the C1 probe for configuration mode
+                samples = time_calls(lambda i: module.set_mode(modes[i % 2], probe=False), args.iterations)
+                results[name] = summarize(samples)
+            finally:
+                module.disconnect()
+    return results
+
+
+def bench_send(args):
+    """Throughput from the host of one module to the host of a linked module
+    Only bytes that reach the receiving host count: unpaced writes overflow the
+    module's transmit buffer, and the bytes it drops are reported separately."""
+    results = {}
+    for name in ("write_data", "send_stream"):
+        with SimulatedE32(registers=FAST_AIR_REGISTERS, mode=ModuleMode.NORMAL, time_scale=args.air_time_scale) as tx_sim, \
+                SimulatedE32(registers=FAST_AIR_REGISTERS, mode=ModuleMode.NORMAL) as rx_sim:
+            tx_sim.link(rx_sim)
+            air_data_rate = tx_sim.air_data_rate / args.air_time_scale
+            sender = connect(tx_sim)
+            receiver = connect(rx_sim)
+            try:
+                payload = bytes(i % 256 for i in range(args.payload))
+                start = time.perf_counter()
+                if name == "write_data":
+                    written = sender.write_data(payload)
+                else:
+                    written = sender.send_stream(io.BytesIO(payload), air_data_rate=air_data_rate)
+
+                # Everything the simulator accepted is delivered; wait for that much
+                tx_sim.wait_aux(False, timeout=1)
+                tx_sim.wait_aux(True, timeout=60)
+                received = read_bytes(receiver, written - tx_sim.bytes_dropped, 5)
+                elapsed = time.perf_counter() - start
+
+                results[name] = {
+                    "payload_bytes": args.payload,
+                    "written_bytes": written,
+                    "delivered_bytes": len(received),
+                    "dropped_bytes": tx_sim.bytes_dropped,
+                    "seconds": round(elapsed, 3),
+                    "delivered_throughput_bps": round(len(received) * 8 / elapsed, 1),
+                }
+            finally:
+                sender.disconnect()
+                receiver.disconnect()
+    results["scaled_air_data_rate_bps"] = air_data_rate
+    return results
+
+
+def bench_tx_queue(args):
+    """Sustained throughput of the transmit queue and bytes lost on the way"""
+    results = {}
+    for name in ("aux", "model"):
+        with SimulatedE32(registers=FAST_AIR_REGISTERS, mode=ModuleMode.NORMAL, time_scale=args.air_time_scale) as tx_sim, \
+                SimulatedE32(registers=FAST_AIR_REGISTERS, mode=ModuleMode.NORMAL) as rx_sim:
+            tx_sim.link(rx_sim)
+            air_data_rate = tx_sim.air_data_rate / args.air_time_scale
+            if name == "aux":
+                sender = E32Module(port=tx_sim.port, aux_pin=22, manual_config=True,
+                                   gpio_backend=SimulatedGPIO(tx_sim, aux_pin=22))
+                if not sender.connect():
+                    raise RuntimeError(f"Cannot open {tx_sim.port}")
+            else:
+                sender = connect(tx_sim)
+            receiver = connect(rx_sim)
+            try:
+                payload = bytes(i % 256 for i in range(args.payload))
+                received = []
+                reader = threading.Thread(target=lambda: received.append(read_bytes(receiver, args.payload, 60)))
+                reader.start()
+
+                start = time.perf_counter()
+                sender.queue_data(payload, air_data_rate=air_data_rate)
+                sender.wait_transmitted()
+                # Done once the last sub-packet has gone on air
+                tx_sim.wait_aux(True, timeout=60)
+                elapsed = time.perf_counter() - start
+                reader.join()
+
+                results[name] = {
+                    "payload_bytes": args.payload,
+                    "delivered_bytes": len(received[0]),
+                    "dropped_bytes": tx_sim.bytes_dropped,
+                    "seconds": round(elapsed, 3),
+                    "delivered_throughput_bps": round(len(received[0]) * 8 / elapsed, 1),
+                    "efficiency": round(len(received[0]) * 8 / elapsed / air_data_rate, 3),
+                }
+            finally:
+                sender.disconnect()
+                receiver.disconnect()
+    results["scaled_air_data_rate_bps"] = air_data_rate
+    return results
+
+
+def bench_receive(args):
+    """Latency from a packet arriving over the air to the host reading it, and bulk throughput"""
+    with SimulatedE32(registers=FAST_AIR_REGISTERS, mode=ModuleMode.NORMAL) as sim:
+        module = connect(sim)
+        try:
+            packet = bytes(range(SUB_PACKET_SIZE))
+
+            # read_data is the receive path used by the GUI monitor and the receive command
+            def receive_one(i):
+                sim.inject(packet)
+                return len(read_bytes(module, len(packet), 1)) == len(packet)
+
+            latency = summarize(time_calls(receive_one, args.iterations))
+
+            # Bulk: inject from another thread while the host reads everything back
+            count = max(1, args.payload // len(packet))
+            injector = threading.Thread(target=lambda: [sim.inject(packet) for _ in range(count)])
+            start = time.perf_counter()
+            injector.start()
+            received = read_bytes(module, count * len(packet), 10)
+            elapsed = time.perf_counter() - start
+            injector.join()
+
+            return {
+                "packet_latency": latency,
+                "bulk_bytes": len(received),
+                "bulk_throughput_bps": round(len(received) * 8 / elapsed, 1),
+            }
+        finally:
+            module.disconnect()
+
+
+def main():
+    """Main entry point"""
+    parser = argparse.ArgumentParser(description="Benchmark E32Module against simulated modules")
+    parser.add_argument("--only", nargs="+", choices=BENCHMARKS, help="Benchmarks to run (default: all)")
+    parser.add_argument("--iterations", type=int, default=100, help="Calls per latency benchmark (default: 100)")
+    parser.add_argument("--reset-iterations", type=int, default=3,
+                        help="Calls to reset_module, which waits 1s each (default: 3)")
+    parser.add_argument("--payload", type=int, default=4096, help="Bytes for throughput benchmarks (default: 4096)")
+    parser.add_argument("--sim-latency", type=float, default=0.0,
+                        help="Simulated response latency in seconds (default: 0)")
+    parser.add_argument("--sim-mode-switch", type=float, default=0.01,
+                        help="Simulated time AUX stays LOW after a mode change in seconds (default: 0.01)")
+    parser.add_argument("--air-time-scale", type=float, default=0.05,
+                        help="Air time multiplier for the send benchmark (default: 0.05)")
+    parser.add_argument("--output", "-o", help="Write the results as JSON to this file")
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.ERROR)
+
+    runners = {
+        "config": bench_config,
+        "probe": bench_probe,
+        "mode-switch": bench_mode_switch,
+        "send": bench_send,
+        "tx-queue": bench_tx_queue,
+        "receive": bench_receive,
+    }
+    results = {"python": sys.version.split()[0], "iterations": args.iterations}
+    for name in args.only or BENCHMARKS:
+        results[name] = runners[name](args)
+
+    write_results(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,443 @@
+#!/usr/bin/env python3
+"""
+asyncio interface to E32 LoRa modules
+-------------------------------------
+AsyncE32Module offers coroutine versions of the E32Module operations for use in
+asyncio applications. The serial port is served by a file descriptor reader on
+the event loop instead of blocking reads, so one loop can drive many modules
+without a thread per port (posix only: the loop must support add_reader).
+
+Parameter encoding, response parsing and GPIO mode pins are shared with
+E32Module. Mode pin changes sleep while the module settles, so they run in the
+loop's default executor. Errors follow E32Module too: they are logged and the
+methods return None or False.
+
+Example:
+    async def main():
+        module = AsyncE32Module("/dev/ttyUSB0")
+        if await module.connect():
+            print(await module.get_parameters())
+            async for packet in module.packets():
+                print(packet.hex())
+"""
+
+import asyncio
+import os
+import sys
+import logging
+
+from e32_configurator import E32Module, ModuleMode, RESPONSE_LENGTHS
+
+logger = logging.getLogger("E32-Async")
+
+
+class AsyncE32Module:
+    """
+    E32 module driven by an asyncio event loop
+    Commands on one module are serialized with an asyncio lock. Data received
+    outside configuration mode is split into packets at pauses longer than gap
+    seconds (or every max_packet bytes) and queued for packets(); a packet that
+    is still being received when a command starts is queued first, so no data
+    is lost to the command.
+    """
+    # Received packets kept for packets() before the oldest are dropped
+    MAX_QUEUED_PACKETS = 4096
+
+    def __init__(self, port, baudrate=9600, m0_pin=None, m1_pin=None, aux_pin=None, use_gpio=False,
+                 manual_config=False, gap=0.01, max_packet=512, gpio_backend=None, gpio_chip=None):
+        # Opens the port and drives the mode pins; its blocking I/O methods are not used
+        self._module = E32Module(port=port, baudrate=baudrate, timeout=0, m0_pin=m0_pin, m1_pin=m1_pin,
+                                 aux_pin=aux_pin, use_gpio=use_gpio, manual_config=manual_config,
+                                 gpio_backend=gpio_backend, gpio_chip=gpio_chip)
+        self.port = port
+        self.manual_config = manual_config
+        self.gap = gap
+        self.max_packet = max_packet
+        self.current_mode = None
+        self.last_write_skipped = False
+        self.packets_dropped = 0
+
+        self._loop = None
+        self._fd = None
+        self._lock = None
+        self._packets = None
+        self._packet = bytearray()
+        self._packet_timer = None
+        self._response = None
+        self._response_length = 0
+        self._response_waiter = None
+        self._write_waiter = None
+        self._probe_response = None
+        self._registers = None
+        self._registers_volatile = False  # Set by a C2 write, cleared by C0 or reset
+
+    @property
+    def connected(self):
+        """True while the port is open"""
+        return self._fd is not None
+
+    async def connect(self):
+        """Open the port and start serving it on the running event loop"""
+        self._loop = asyncio.get_running_loop()
+        if not self._module.connect():
+            return False
+        try:
+            self._fd = self._module.serial.fileno()
+            os.set_blocking(self._fd, False)
+            self._loop.add_reader(self._fd, self._on_readable)
+        except (AttributeError, NotImplementedError, OSError, ValueError) as e:
+            logger.error(f"Cannot serve {self.port} from the event loop: {e}")
+            self._fd = None
+            self._module.disconnect()
+            return False
+
+        self._lock = asyncio.Lock()
+        self._packets = asyncio.Queue()
+        self._registers = None
+        return True
+
+    def disconnect(self):
+        """Stop serving the port and close it; packets() ends after the queued packets
+        A command waiting for the port fails at once instead of running into its timeout."""
+        if self._fd is None:
+            return
+        self._loop.remove_reader(self._fd)
+        self._loop.remove_writer(self._fd)
+        self._flush_packet()
+        self._fd = None
+        error = ConnectionError(f"Disconnected from {self.port}")
+        for waiter in (self._response_waiter, self._write_waiter):
+            if waiter is not None and not waiter.done():
+                waiter.set_exception(error)
+        self._packets.put_nowait(None)
+        self._module.disconnect()
+
+    async def __aenter__(self):
+        if not await self.connect():
+            raise IOError(f"Failed to connect to module on {self.port}")
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        self.disconnect()
+
+    def _on_readable(self):
+        """Event loop callback: take everything the port has and route it"""
+        try:
+            data = os.read(self._fd, 4096)
+        except BlockingIOError:
+            return
+        except OSError as e:
+            logger.error(f"Read from {self.port} failed: {e}")
+            self.disconnect()
+            return
+        if not data:
+            return
+
+        if self._response is not None:
+            # A command is waiting for its response
+            self._response.extend(data)
+            if len(self._response) >= self._response_length and not self._response_waiter.done():
+                self._response_waiter.set_result(None)
+        elif self.current_mode == ModuleMode.CONFIGURATION:
+            logger.debug(f"Discarding unsolicited data in configuration mode: {data.hex()}")
+        else:
+            self._packet.extend(data)
+            if len(self._packet) >= self.max_packet:
+                self._flush_packet()
+            else:
+                if self._packet_timer:
+                    self._packet_timer.cancel()
+                self._packet_timer = self._loop.call_later(self.gap, self._flush_packet)
+
+    def _flush_packet(self):
+        """Queue the packet being received, if any"""
+        if self._packet_timer:
+            self._packet_timer.cancel()
+            self._packet_timer = None
+        while self._packet:
+            packet = bytes(self._packet[:self.max_packet])
+            del self._packet[:self.max_packet]
+            if self._packets.qsize() >= self.MAX_QUEUED_PACKETS:
+                self._packets.get_nowait()
+                self.packets_dropped += 1
+            self._packets.put_nowait(packet)
+
+    async def packets(self):
+        """Yield packets received over the air until the module is disconnected"""
+        while True:
+            packet = await self._packets.get()
+            if packet is None:
+                self._packets.put_nowait(None)  # Let other iterators end too
+                return
+            yield packet
+
+    async def _write(self, data):
+        """Write all of data, waiting for the port to become writable when it is full"""
+        view = memoryview(bytes(data))
+        while view:
+            if self._fd is None:
+                raise ConnectionError(f"Disconnected from {self.port}")
+            try:
+                written = os.write(self._fd, view)
+            except BlockingIOError:
+                written = 0
+            view = view[written:]
+            if view:
+                writable = self._write_waiter = self._loop.create_future()
+                fd = self._fd
+                self._loop.add_writer(fd, lambda: writable.done() or writable.set_result(None))
+                try:
+                    await writable
+                finally:
+                    self._write_waiter = None
+                    self._loop.remove_writer(fd)
+
+    async def _transact(self, command, timeout=1, response_length=None, retries=0):
+        """Send a command and wait for its response (the lock must be held)
+        An incomplete response is retried up to retries more times, as in
+        E32Module.send_command. Raises OSError if the port fails or is disconnected
+        meanwhile."""
+        if response_length is None:
+            response_length = RESPONSE_LENGTHS.get(command[0], 0)
+        self._probe_response = None
+
+        for attempt in range(retries + 1):
+            response = await self._transact_once(command, timeout, response_length)
+            if len(response) >= response_length:
+                break
+            if attempt < retries:
+                logger.debug(f"Incomplete response for command {bytes(command).hex()}, retrying")
+        if len(response) < response_length:
+            logger.warning(f"No complete response received for command: {bytes(command).hex()}")
+        return response
+
+    async def _transact_once(self, command, timeout, response_length):
+        """Send a command once and return what arrived of its response within timeout"""
+        # Whatever was received so far belongs to the packet stream, not to the response
+        self._flush_packet()
+        self._response = bytearray()
+        self._response_length = response_length
+        self._response_waiter = self._loop.create_future()
+        try:
+            logger.debug(f"Sending command: {bytes(command).hex()}")
+            await self._write(command)
+            if response_length:
+                try:
+                    await asyncio.wait_for(self._response_waiter, timeout)
+                except asyncio.TimeoutError:
+                    pass
+            return self._response
+        finally:
+            waiter = self._response_waiter
+            if waiter.done() and not waiter.cancelled():
+                waiter.exception()  # Failed by disconnect while nobody was waiting on it
+            self._response = None
+            self._response_waiter = None
+
+    async def send_command(self, command, timeout=1, response_length=None):
+        """Send command to the module and receive response"""
+        if not self.connected:
+            logger.error("Not connected to module")
+            return None
+        try:
+            async with self._lock:
+                return await self._transact(command, timeout, response_length)
+        except OSError as e:
+            logger.error(f"Error sending command: {e}")
+            return None
+
+    async def send_data(self, data):
+        """Write data for transmission over the air (the module must be in a transmitting mode)"""
+        if not self.connected:
+            logger.error("Not connected to module")
+            return False
+        try:
+            async with self._lock:
+                self._flush_packet()
+                await self._write(data)
+        except OSError as e:
+            logger.error(f"Error sending data: {e}")
+            return False
+        return True
+
+    async def _set_mode(self, mode):
+        """Drive the mode pins in the executor (the lock must be held)"""
+        if self.current_mode == mode:
+            return True
+        logger.info(f"Setting module to {mode} mode")
+        self._flush_packet()
+        result = await self._loop.run_in_executor(None, self._module._set_mode_pins, mode)
+        if result:
+            self.current_mode = mode
+        return result
+
+    async def set_mode(self, mode):
+        """Set the module's operating mode"""
+        try:
+            async with self._lock:
+                return await self._set_mode(mode)
+        except OSError as e:
+            logger.error(f"Error setting mode: {e}")
+            return False
+
+    async def _enter_config_mode(self):
+        """Probe for configuration mode, switching the pins if the probe fails"""
+        response = await self._transact(bytes([0xC1, 0xC1, 0xC1]), timeout=0.5)
+        if len(response) >= 6 and response[0] in (0xC0, 0xC1):
+            logger.info("Module already in configuration mode")
+            self._probe_response = bytes(response)
+            self._registers = bytes(response[1:6])
+            self.current_mode = ModuleMode.CONFIGURATION
+            return True
+        return await self._set_mode(ModuleMode.CONFIGURATION)
+
+    async def _exit_config_mode(self):
+        """Return to normal mode unless configuration is manual"""
+        self._probe_response = None
+        if self.manual_config:
+            return True
+        return await self._set_mode(ModuleMode.NORMAL)
+
+    async def _read_registers(self):
+        """Read the five register bytes, reusing the probe response if there is one"""
+        response = self._probe_response
+        self._probe_response = None
+        if response is None:
+            response = await self._transact(bytes([0xC1, 0xC1, 0xC1]), retries=E32Module.READ_RETRIES)
+        if E32Module._parse_parameters(response) is None:
+            self._registers = None
+            return None
+        self._registers = bytes(response[1:6])
+        return self._registers
+
+    async def get_parameters(self):
+        """Read all parameters from the module"""
+        if not self.connected:
+            logger.error("Not connected to module")
+            return None
+        try:
+            async with self._lock:
+                if not await self._enter_config_mode():
+                    return None
+                try:
+                    registers = await self._read_registers()
+                    return E32Module._decode_registers(registers) if registers is not None else None
+                finally:
+                    await self._exit_config_mode()
+        except OSError as e:
+            logger.error(f"Error reading parameters: {e}")
+            return None
+
+    async def set_parameters(self, params, skip_unchanged=False, persist=True):
+        """Write parameters to the module
+        Same behaviour as E32Module.set_parameters, whose write planning is shared:
+        fields missing from params keep their current value, skip_unchanged avoids
+        writing values the module already has, and persist=False applies them with
+        C2 without saving to flash."""
+        self.last_write_skipped = False
+        if not self.connected:
+            logger.error("Not connected to module")
+            return False
+        try:
+            async with self._lock:
+                if not await self._enter_config_mode():
+                    return False
+                try:
+                    base = self._registers
+                    if E32Module._needs_current_registers(params, base, skip_unchanged):
+                        base = await self._read_registers()
+                    try:
+                        command = E32Module._plan_write(params, base, skip_unchanged, persist,
+                                                        self._registers_volatile)
+                    except ValueError as e:
+                        logger.error(str(e))
+                        return False
+                    if command is None:
+                        logger.info("Module parameters already match, write skipped")
+                        self.last_write_skipped = True
+                        return True
+
+                    response = await self._transact(command)
+                    self._registers, self._registers_volatile = E32Module._write_result(
+                        command, response, self._registers_volatile)
+                    return True
+                finally:
+                    await self._exit_config_mode()
+        except OSError as e:
+            logger.error(f"Error setting parameters: {e}")
+            return False
+
+    async def version(self):
+        """Get module version"""
+        if not self.connected:
+            logger.error("Not connected to module")
+            return None
+        try:
+            async with self._lock:
+                if not await self._enter_config_mode():
+                    return None
+                try:
+                    response = await self._transact(bytes([0xC3, 0xC3, 0xC3]), retries=E32Module.READ_RETRIES)
+                    if len(response) >= 4 and response[0] == 0xC3:
+                        return {"model": response[1], "version": response[2], "features": response[3]}
+                    logger.error("Invalid response when getting version")
+                    return None
+                finally:
+                    await self._exit_config_mode()
+        except OSError as e:
+            logger.error(f"Error getting version: {e}")
+            return None
+
+    async def reset_module(self):
+        """Reset the module"""
+        if not self.connected:
+            logger.error("Not connected to module")
+            return False
+        try:
+            async with self._lock:
+                if not await self._enter_config_mode():
+                    return False
+                try:
+                    await self._transact(bytes([0xC4, 0xC4, 0xC4]))
+                    self._registers = None
+                    self._registers_volatile = False
+
+                    # Give the module time to restart
+                    await asyncio.sleep(1)
+                    logger.info("Module reset sent")
+                    return True
+                finally:
+                    await self._exit_config_mode()
+        except OSError as e:
+            logger.error(f"Error resetting module: {e}")
+            return False
+
+
+def main():
+    """Print the parameters of every port given on the command line, read concurrently"""
+    async def read(port):
+        module = AsyncE32Module(port, manual_config=True)
+        if not await module.connect():
+            return port, None
+        try:
+            return port, await module.get_parameters()
+        finally:
+            module.disconnect()
+
+    async def read_all(ports):
+        return await asyncio.gather(*(read(port) for port in ports))
+
+    if len(sys.argv) < 2:
+        print(f"Usage: {sys.argv[0]} PORT [PORT ...]", file=sys.stderr)
+        return 1
+    loop = asyncio.new_event_loop()
+    try:
+        for port, params in loop.run_until_complete(read_all(sys.argv[1:])):
+            print(port, params)
+    finally:
+        loop.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
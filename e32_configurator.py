@@ -12,14 +12,23 @@ Usage:
     - Run with --help to see all available CLI options
 """
 
+import abc
 import argparse
+import functools
 import sys
 import time
 import threading
 import json
 import os
+import glob
+import io
+import select
+import selectors
 import serial
 import serial.tools.list_ports
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 from enum import Enum, auto
 import logging
 
@@ -53,48 +62,583 @@ class ModuleMode(Enum):
     WOR_RECEIVING = auto()   # M0=0, M1=1: WOR receiving mode
     CONFIGURATION = auto()   # M0=1, M1=1: Configuration mode (for setting parameters)
 
+# Length of the module's response to each command header, in bytes.
+# C0/C2 echo the 6-byte parameter frame, C1 returns the 6-byte parameter frame,
+# C3 returns a 4-byte version frame and C4 (reset) does not answer at all.
+RESPONSE_LENGTHS = {
+    0xC0: 6,
+    0xC1: 6,
+    0xC2: 6,
+    0xC3: 4,
+    0xC4: 0,
+}
+
+# Air data rate in bits per second for each SPED air rate index
+AIR_DATA_RATES = [300, 1200, 2400, 4800, 9600, 19200, 19200, 19200]
+
+# Size of the module's transmit buffer and of one transmitted sub-packet, in bytes
+TX_BUFFER_SIZE = 512
+SUB_PACKET_SIZE = 58
+
+# M0 and M1 pin levels (True = HIGH) for each operating mode
+MODE_PINS = {
+    ModuleMode.NORMAL: (False, False),
+    ModuleMode.WOR_SENDING: (True, False),
+    ModuleMode.WOR_RECEIVING: (False, True),
+    ModuleMode.CONFIGURATION: (True, True),
+}
+
+class GPIOBackend(abc.ABC):
+    """
+    Interface to the GPIO pins wired to M0, M1 (outputs) and AUX (input)
+    Pins are numbered the way the backend numbers them (BCM for RPi.GPIO,
+    line offsets for a gpiochip). Levels are booleans, True meaning HIGH.
+    A backend must implement setup_output, setup_input, write and read, or it
+    cannot be instantiated; wait_for_edge and close have working defaults.
+    """
+    @abc.abstractmethod
+    def setup_output(self, pin):
+        """Configure pin as an output"""
+        raise NotImplementedError
+        
+    @abc.abstractmethod
+    def setup_input(self, pin):
+        """Configure pin as an input that can be waited on for rising edges"""
+        raise NotImplementedError
+        
+    @abc.abstractmethod
+    def write(self, pin, level):
+        """Drive an output pin HIGH (True) or LOW (False)"""
+        raise NotImplementedError
+        
+    @abc.abstractmethod
+    def read(self, pin):
+        """Return the level of an input pin"""
+        raise NotImplementedError
+        
+    def wait_for_edge(self, pin, timeout):
+        """Sleep until pin rises or timeout seconds pass; returns False on timeout
+        The default implementation polls; backends override it with a real edge wait."""
+        deadline = time.monotonic() + timeout
+        while not self.read(pin):
+            if time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+        
+    def close(self):
+        """Release the pins"""
+
+class RPiGPIOBackend(GPIOBackend):
+    """
+    GPIO through the RPi.GPIO library (BCM pin numbers)
+    """
+    def __init__(self):
+        import RPi.GPIO as GPIO
+        self.GPIO = GPIO
+        self.GPIO.setmode(GPIO.BCM)
+        self._pins = []
+        
+    def setup_output(self, pin):
+        self.GPIO.setup(pin, self.GPIO.OUT)
+        self._pins.append(pin)
+        
+    def setup_input(self, pin):
+        self.GPIO.setup(pin, self.GPIO.IN)
+        self._pins.append(pin)
+        
+    def write(self, pin, level):
+        self.GPIO.output(pin, self.GPIO.HIGH if level else self.GPIO.LOW)
+        
+    def read(self, pin):
+        return bool(self.GPIO.input(pin))
+        
+    def wait_for_edge(self, pin, timeout):
+        return self.GPIO.wait_for_edge(pin, self.GPIO.RISING, timeout=max(1, int(timeout * 1000))) is not None
+        
+    def close(self):
+        # Only our pins: other modules may be driving pins through RPi.GPIO too
+        if self._pins:
+            self.GPIO.cleanup(self._pins)
+            self._pins = []
+
+class GpiodBackend(GPIOBackend):
+    """
+    GPIO through the Linux GPIO character device (/dev/gpiochipN) with the gpiod
+    bindings of libgpiod, version 1.x or 2.x (pins are line offsets on the chip)
+    AUX rising edges are delivered as kernel line events, so none are missed.
+    """
+    CONSUMER = "e32-configurator"
+    
+    def __init__(self, chip="/dev/gpiochip0"):
+        import gpiod
+        self.gpiod = gpiod
+        self.chip = chip
+        self._lines = {}
+        self._v2 = hasattr(gpiod, "request_lines")
+        self._chip = None if self._v2 else gpiod.Chip(chip)
+        
+    def _request(self, pin, output):
+        gpiod = self.gpiod
+        if self._v2:
+            from gpiod.line import Direction, Edge, Value
+            if output:
+                settings = gpiod.LineSettings(direction=Direction.OUTPUT, output_value=Value.INACTIVE)
+            else:
+                settings = gpiod.LineSettings(direction=Direction.INPUT, edge_detection=Edge.RISING)
+            self._lines[pin] = gpiod.request_lines(self.chip, consumer=self.CONSUMER, config={pin: settings})
+        else:
+            line = self._chip.get_line(pin)
+            line.request(consumer=self.CONSUMER,
+                         type=gpiod.LINE_REQ_DIR_OUT if output else gpiod.LINE_REQ_EV_RISING_EDGE)
+            self._lines[pin] = line
+            
+    def setup_output(self, pin):
+        self._request(pin, output=True)
+        
+    def setup_input(self, pin):
+        self._request(pin, output=False)
+        
+    def write(self, pin, level):
+        if self._v2:
+            from gpiod.line import Value
+            self._lines[pin].set_value(pin, Value.ACTIVE if level else Value.INACTIVE)
+        else:
+            self._lines[pin].set_value(1 if level else 0)
+            
+    def read(self, pin):
+        if self._v2:
+            from gpiod.line import Value
+            return self._lines[pin].get_value(pin) == Value.ACTIVE
+        return bool(self._lines[pin].get_value())
+        
+    def wait_for_edge(self, pin, timeout):
+        line = self._lines[pin]
+        if self._v2:
+            if line.wait_edge_events(timeout):
+                line.read_edge_events()
+                return True
+            return False
+        seconds = int(timeout)
+        if line.event_wait(sec=seconds, nsec=int((timeout - seconds) * 1e9)):
+            line.event_read()
+            return True
+        return False
+        
+    def close(self):
+        for line in self._lines.values():
+            line.release()
+        self._lines = {}
+        if self._chip is not None:
+            self._chip.close()
+
+class FakeGPIOBackend(GPIOBackend):
+    """
+    In-memory GPIO for tests and benchmarks
+    Output levels are kept in levels and reported to on_write(pin, level);
+    inputs are driven with set_level. Inputs start HIGH (an idle AUX pin).
+    """
+    def __init__(self, on_write=None):
+        self.levels = {}
+        self.on_write = on_write
+        self._cond = threading.Condition()
+        
+    def setup_output(self, pin):
+        self.levels.setdefault(pin, False)
+        
+    def setup_input(self, pin):
+        self.levels.setdefault(pin, True)
+        
+    def write(self, pin, level):
+        self.set_level(pin, level)
+        if self.on_write:
+            self.on_write(pin, bool(level))
+            
+    def read(self, pin):
+        return self.levels.get(pin, False)
+        
+    def set_level(self, pin, level):
+        """Set the level of a pin, waking up waits for it to rise"""
+        with self._cond:
+            self.levels[pin] = bool(level)
+            self._cond.notify_all()
+            
+    def wait_for_edge(self, pin, timeout):
+        with self._cond:
+            return self._cond.wait_for(lambda: self.levels.get(pin, False), timeout)
+
+# GPIO backends that can be selected by name (--gpio-backend)
+GPIO_BACKENDS = {
+    "rpi": RPiGPIOBackend,
+    "gpiod": GpiodBackend,
+}
+
+def create_gpio_backend(name="rpi", chip=None):
+    """Create a GPIO backend by name; raises ImportError if its library is missing"""
+    if name == "gpiod":
+        return GpiodBackend(chip or "/dev/gpiochip0")
+    return GPIO_BACKENDS[name]()
+
+def _exclusive(method):
+    """Run an E32Module method while holding the module's I/O lock
+    Config transactions are serialized with each other and with read_data in the
+    receive thread, so a response is never split between two readers."""
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        with self._io_lock:
+            return method(self, *args, **kwargs)
+    return wrapper
+
+class LatencyHistogram:
+    """
+    Fixed-size latency histogram with roughly logarithmic buckets (milliseconds)
+    Memory use does not grow with the number of samples; percentiles are
+    reported as the upper bound of the bucket they fall into.
+    """
+    BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+    
+    def __init__(self):
+        self.counts = [0] * (len(self.BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.min_ms = None
+        self.max_ms = None
+        
+    def record(self, value_ms):
+        """Add one sample"""
+        index = 0
+        while index < len(self.BUCKET_BOUNDS_MS) and value_ms > self.BUCKET_BOUNDS_MS[index]:
+            index += 1
+        self.counts[index] += 1
+        self.count += 1
+        self.total_ms += value_ms
+        self.min_ms = value_ms if self.min_ms is None else min(self.min_ms, value_ms)
+        self.max_ms = value_ms if self.max_ms is None else max(self.max_ms, value_ms)
+        
+    def percentile(self, pct):
+        """Return the bucket upper bound below which pct percent of the samples fall"""
+        if not self.count:
+            return None
+        rank = pct / 100.0 * self.count
+        seen = 0
+        for index, bucket_count in enumerate(self.counts):
+            seen += bucket_count
+            if seen >= rank and bucket_count:
+                if index < len(self.BUCKET_BOUNDS_MS):
+                    return min(self.BUCKET_BOUNDS_MS[index], self.max_ms)
+                return self.max_ms
+        return self.max_ms
+        
+    def as_dict(self):
+        """Summary of the histogram for reports"""
+        if not self.count:
+            return {"count": 0}
+        return {
+            "count": self.count,
+            "min_ms": round(self.min_ms, 3),
+            "mean_ms": round(self.total_ms / self.count, 3),
+            "p50_ms": round(self.percentile(50), 3),
+            "p95_ms": round(self.percentile(95), 3),
+            "p99_ms": round(self.percentile(99), 3),
+            "max_ms": round(self.max_ms, 3),
+            "buckets": dict(zip([f"<={bound}" for bound in self.BUCKET_BOUNDS_MS] + ["more"], self.counts)),
+        }
+
+class CommandStats:
+    """
+    Counters and latency histograms for one command type on one module
+    """
+    def __init__(self):
+        self.calls = 0
+        self.timeouts = 0
+        self.retries = 0
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.first_byte = LatencyHistogram()  # Time from write to the first response byte
+        self.last_byte = LatencyHistogram()   # Time from write to the complete response
+        
+    def record(self, sent, received, first_byte_ms=None, last_byte_ms=None, timed_out=False, retry=False):
+        """Record one attempt of the command"""
+        self.calls += 1
+        self.bytes_sent += sent
+        self.bytes_received += received
+        if retry:
+            self.retries += 1
+        if timed_out:
+            self.timeouts += 1
+        if first_byte_ms is not None:
+            self.first_byte.record(first_byte_ms)
+        if last_byte_ms is not None and not timed_out:
+            self.last_byte.record(last_byte_ms)
+            
+    def as_dict(self):
+        """Summary of the counters and histograms for reports"""
+        return {
+            "calls": self.calls,
+            "timeouts": self.timeouts,
+            "retries": self.retries,
+            "bytes_sent": self.bytes_sent,
+            "bytes_received": self.bytes_received,
+            "time_to_first_byte": self.first_byte.as_dict(),
+            "time_to_last_byte": self.last_byte.as_dict(),
+        }
+
+class ReceiveBuffer:
+    """
+    Preallocated buffer for data received from the serial port
+    Data is read straight into a fixed bytearray with readinto and handed out as
+    memoryview slices of it, so receiving does not allocate per read. Unread data
+    is kept contiguous: the buffer starts over at the front whenever it has been
+    drained, and unread data is moved to the front only when the end is reached.
+    
+    A view returned by take() is for immediate use, unless it was taken with
+    share=True: bytes under a shared view are never written again. Space that
+    shared views covered is reused once they are all gone; while one of them is
+    still referenced, a new bytearray is allocated instead.
+    """
+    def __init__(self, size):
+        self._buffer = bytearray(size)
+        self._view = memoryview(self._buffer)
+        self.size = size
+        self.start = 0
+        self.end = 0
+        self.dropped_bytes = 0
+        self._shared = False  # Views handed out with share=True cover space before start
+        
+    def __len__(self):
+        return self.end - self.start
+        
+    def clear(self):
+        """Forget all unread data"""
+        self.start = self.end if self._shared else 0
+        self.end = self.start
+        
+    def _views_alive(self):
+        """True if a view handed out with take(share=True) is still referenced
+        A bytearray refuses to be resized while any memoryview of it exists."""
+        self._view.release()
+        try:
+            self._buffer.append(0)
+            del self._buffer[-1]
+            return False
+        except BufferError:
+            return True
+        finally:
+            self._view = memoryview(self._buffer)
+            
+    def _make_room(self):
+        """Return the free space at the end, moving or dropping old data if there is none
+        Callers must drop the returned view before calling this again."""
+        if self.start == self.end and not self._shared:
+            self.start = self.end = 0
+        elif self.end == self.size:
+            if self.start == 0:
+                # Full of unread data: drop the oldest quarter
+                drop = self.size // 4
+                logger.warning(f"Receive buffer full, dropped {drop} oldest bytes")
+                self.dropped_bytes += drop
+                self.start = drop
+            length = self.end - self.start
+            if self._shared and self._views_alive():
+                # Shared views still point into this buffer: move on to a new one
+                old = self._view
+                self._buffer = bytearray(self.size)
+                self._view = memoryview(self._buffer)
+                self._view[:length] = old[self.start:self.end]
+            else:
+                self._view[:length] = self._view[self.start:self.end]  # memmove, may overlap
+            self._shared = False
+            self.start, self.end = 0, length
+        return self._view[self.end:]
+        
+    def fill(self, readinto, limit):
+        """Read up to limit bytes with readinto(view) into the buffer; returns the count"""
+        count = 0
+        while count < limit:
+            n = readinto(self._make_room()[:limit - count]) or 0
+            if not n:
+                break
+            self.end += n
+            count += n
+        return count
+        
+    def write(self, data):
+        """Copy data into the buffer (for ports that can only return bytes)"""
+        data = memoryview(data)
+        while data:
+            free = self._make_room()
+            n = min(len(free), len(data))
+            free[:n] = data[:n]
+            del free
+            self.end += n
+            data = data[n:]
+            
+    def take(self, max_bytes, share=False):
+        """Remove up to max_bytes of unread data and return it as a memoryview
+        With share=True the view may be kept: its bytes are never overwritten."""
+        n = min(max_bytes, self.end - self.start)
+        view = self._view[self.start:self.start + n]
+        self.start += n
+        if share and n:
+            self._shared = True
+        return view
+
 class E32Module:
     """
     Handles communication with the E32 LoRa module
     """
-    def __init__(self, port=None, baudrate=9600, timeout=1, m0_pin=None, m1_pin=None, aux_pin=None, use_gpio=False, manual_config=False):
+    # Received data set aside while a command runs is kept up to this many bytes
+    RX_BUFFER_LIMIT = 64 * 1024
+    
+    # Read window of the receive loop on ports that cannot be waited on with select
+    READ_WINDOW = 0.05
+    
+    # Mode switch timing (seconds). With an AUX pin the switch is done once AUX rises
+    # plus the 2 ms the datasheet asks for; without one a fixed delay is used.
+    AUX_SETTLE = 0.002
+    MODE_SWITCH_DELAY = 0.1
+    
+    # Longest single edge wait before the AUX level is checked again, so a rising
+    # edge just before the wait started delays it by at most this much
+    AUX_EDGE_SLICE = 0.05
+    
+    # Extra attempts for the read-only commands (C1 read, C3 version) when the
+    # response comes back incomplete; they change nothing, so repeating is safe
+    READ_RETRIES = 1
+    
+    # queue_data blocks while this many bytes are waiting to be transmitted
+    TX_QUEUE_LIMIT = 64 * 1024
+    
+    # How often the transmit worker checks whether configuration mode has ended
+    TX_HOLD_RETRY = 0.05
+    
+    # Longest time the module is given to pull AUX LOW after taking in a burst;
+    # until it does, a HIGH AUX does not mean the burst has been transmitted
+    AUX_BUSY_DELAY = 0.01
+    
+    def __init__(self, port=None, baudrate=9600, timeout=1, m0_pin=None, m1_pin=None, aux_pin=None, use_gpio=False, manual_config=False,
+                 gpio_backend=None, gpio_chip=None):
         self.port = port
         self.baudrate = baudrate
         self.timeout = timeout
         self.serial = None
         self.current_mode = None
         
-        # GPIO pins for module control (optional, for Raspberry Pi or similar)
+        # Parameter frame returned by the last successful config mode probe.
+        # The probe is a C1 query, so get_parameters can use it instead of asking again.
+        self._probe_response = None
+        
+        # Shadow copy of the five register bytes (ADDH, ADDL, SPED, CHAN, OPTION)
+        # from the last successful read or write, or None when unknown
+        self._registers = None
+        
+        # True after a C2 (volatile) write until the next C0 write or reset: the module
+        # is then running values that may differ from the ones saved in flash
+        self._registers_volatile = False
+        
+        # True if the last set_parameters call found nothing to change and skipped the write
+        self.last_write_skipped = False
+        
+        # Per-command latency and error statistics, keyed by command name
+        self.stats = {}
+        self._stats_lock = threading.Lock()
+        self._first_byte_at = None
+        
+        # Nesting depth and result of the active config_session, if any
+        self._session_depth = 0
+        self._session_ready = False
+        
+        # Serializes access to the port between the receive thread and config commands.
+        # Data received over the air that is pending when a command starts is moved
+        # to _rx_buffer instead of being flushed, and read_data returns it first.
+        self._io_lock = threading.RLock()
+        self._rx_buffer = ReceiveBuffer(self.RX_BUFFER_LIMIT)
+        self._rx_file = None  # Unbuffered reader on the port's file descriptor, for readinto
+        self._fd = None
+        self._wake_pipe = None
+        self._read_cancelled = threading.Event()
+        
+        # Model of the module's transmit buffer used when AUX is not wired: bytes
+        # still waiting to go on air, as of _tx_updated (time.monotonic())
+        self._tx_buffered = 0.0
+        self._tx_updated = 0.0
+        self._tx_burst = 0  # Bytes written since AUX was last seen HIGH
+        
+        # Transmit queue filled by queue_data and written by a worker thread
+        # as the module's buffer has room
+        self._tx_queue = deque()      # memoryviews of the queued data
+        self._tx_queued = 0           # Bytes in _tx_queue
+        self._tx_in_flight = 0        # Bytes taken from the queue, not yet written
+        self._tx_cond = threading.Condition()
+        self._tx_thread = None
+        self._tx_stopping = False
+        self._tx_rate = None          # Air data rate given to queue_data (bits per second)
+        self._tx_error = None         # Write error not yet reported by wait_transmitted
+        self.bytes_transmitted = 0
+        
+        # GPIO pins for module control (optional, for Raspberry Pi or similar).
+        # gpio_backend is a GPIOBackend instance, or the name of one ("rpi" by default,
+        # or "gpiod" for the gpiochip character device given by gpio_chip). A backend
+        # created here is closed by disconnect() and created again by connect();
+        # one that was passed in is left to the caller.
         self.m0_pin = m0_pin
         self.m1_pin = m1_pin
         self.aux_pin = aux_pin
-        self.use_gpio = use_gpio
+        self.use_gpio = use_gpio or isinstance(gpio_backend, GPIOBackend)
+        self.gpio = None
+        self._gpio_backend = gpio_backend
+        self._gpio_chip = gpio_chip
+        self._owns_gpio = False
         
         # Flag to indicate if the user has manually set configuration mode
         self.manual_config = manual_config
         
         # Initialize GPIO if available and requested
         if self.use_gpio:
+            self._setup_gpio()
+    
+    def _setup_gpio(self):
+        """Set up the mode and AUX pins, creating the GPIO backend unless one was given"""
+        try:
+            if isinstance(self._gpio_backend, GPIOBackend):
+                self.gpio = self._gpio_backend
+            else:
+                self.gpio = create_gpio_backend(self._gpio_backend or "rpi", self._gpio_chip)
+                self._owns_gpio = True
+            if self.m0_pin:
+                self.gpio.setup_output(self.m0_pin)
+            if self.m1_pin:
+                self.gpio.setup_output(self.m1_pin)
+            if self.aux_pin:
+                self.gpio.setup_input(self.aux_pin)
+            logger.info("GPIO initialized for module control")
+        except ImportError:
+            logger.warning("GPIO library not available. Cannot control module pins directly.")
+            self.use_gpio = False
+        except OSError as e:
+            logger.error(f"Cannot access GPIO pins: {e}")
+            self.use_gpio = False
+            self._release_gpio()
+    
+    def _release_gpio(self):
+        """Close the GPIO backend if it was created by this module, freeing its pins"""
+        if self._owns_gpio and self.gpio is not None:
             try:
-                import RPi.GPIO as GPIO
-                self.GPIO = GPIO
-                self.GPIO.setmode(GPIO.BCM)
-                if self.m0_pin:
-                    self.GPIO.setup(self.m0_pin, GPIO.OUT)
-                if self.m1_pin:
-                    self.GPIO.setup(self.m1_pin, GPIO.OUT)
-                if self.aux_pin:
-                    self.GPIO.setup(self.aux_pin, GPIO.IN)
-                logger.info("GPIO initialized for module control")
-            except ImportError:
-                logger.warning("GPIO library not available. Cannot control module pins directly.")
-                self.use_gpio = False
+                self.gpio.close()
+            except OSError as e:
+                logger.warning(f"Error releasing GPIO pins: {e}")
+            self.gpio = None
+            self._owns_gpio = False
     
     def connect(self):
         """Connect to the LoRa module"""
+        self.invalidate_registers()
+        if self.use_gpio and self.gpio is None:
+            self._setup_gpio()  # Released by the last disconnect
         try:
-            self.serial = serial.Serial(
-                port=self.port,
+            # serial_for_url also accepts pyserial URLs such as loop:// or socket://
+            self.serial = serial.serial_for_url(
+                self.port,
                 baudrate=self.baudrate,
                 timeout=self.timeout,
                 bytesize=serial.EIGHTBITS,
@@ -102,6 +646,19 @@ class E32Module:
                 stopbits=serial.STOPBITS_ONE
             )
             logger.info(f"Connected to port {self.port} at {self.baudrate} baud")
+            
+            # read_data waits on the file descriptor so it never holds the lock while idle
+            self._rx_buffer.clear()
+            self._fd = None
+            if os.name == 'posix':
+                try:
+                    self._fd = self.serial.fileno()
+                    self._rx_file = io.FileIO(self._fd, 'r', closefd=False)
+                    if self._wake_pipe is None:
+                        self._wake_pipe = os.pipe()
+                except (AttributeError, OSError, ValueError):
+                    self._fd = None
+                    self._rx_file = None
             return True
         except serial.SerialException as e:
             logger.error(f"Failed to connect: {e}")
@@ -109,162 +666,608 @@ class E32Module:
             
     def disconnect(self):
         """Disconnect from the LoRa module"""
-        if self.serial and self.serial.is_open:
-            self.serial.close()
-            logger.info("Disconnected from module")
+        self._probe_response = None
+        self.invalidate_registers()
+        self.cancel_read()
+        self._stop_transmit()
+        with self._io_lock:
+            if self.serial and self.serial.is_open:
+                self.serial.close()
+                logger.info("Disconnected from module")
+            self._fd = None
+            self._rx_file = None
+            self._rx_buffer.clear()
+            if self._wake_pipe:
+                for fd in self._wake_pipe:
+                    os.close(fd)
+                self._wake_pipe = None
+            self._release_gpio()
     
     def _set_mode_pins(self, mode):
         """Set M0 and M1 pins for the specified mode"""
-        if not self.use_gpio or not (self.m0_pin and self.m1_pin):
+        if not self.use_gpio or self.gpio is None or not (self.m0_pin and self.m1_pin):
             logger.warning("Cannot set mode pins: GPIO control not available or pins not specified")
             logger.info("Please ensure M0 and M1 pins are set correctly manually")
             # Return True to allow operation to continue if user has manually set the pins
             return True
             
-        if mode == ModuleMode.NORMAL:
-            self.GPIO.output(self.m0_pin, GPIO.LOW)
-            self.GPIO.output(self.m1_pin, GPIO.LOW)
-        elif mode == ModuleMode.WOR_SENDING:
-            self.GPIO.output(self.m0_pin, GPIO.HIGH)
-            self.GPIO.output(self.m1_pin, GPIO.LOW)
-        elif mode == ModuleMode.WOR_RECEIVING:
-            self.GPIO.output(self.m0_pin, GPIO.LOW)
-            self.GPIO.output(self.m1_pin, GPIO.HIGH)
-        elif mode == ModuleMode.CONFIGURATION:
-            self.GPIO.output(self.m0_pin, GPIO.HIGH)
-            self.GPIO.output(self.m1_pin, GPIO.HIGH)
-        else:
+        if mode not in MODE_PINS:
             logger.error(f"Invalid mode: {mode}")
             return False
             
-        # Wait for AUX pin to go HIGH if available
-        if self.aux_pin:
-            timeout = 100  # 1 second (10ms * 100)
-            while timeout > 0 and not self.GPIO.input(self.aux_pin):
-                time.sleep(0.01)
-                timeout -= 1
+        m0_level, m1_level = MODE_PINS[mode]
+        self.gpio.write(self.m0_pin, m0_level)
+        self.gpio.write(self.m1_pin, m1_level)
             
-            if timeout <= 0:
+        # Wait for AUX pin to go HIGH if available, otherwise give the module
+        # a fixed time to complete the mode switch
+        if self.aux_pin:
+            if not self._wait_aux_high():
                 logger.warning("Timeout waiting for AUX pin to go HIGH")
-                
-        # Additional delay to ensure mode switch is complete
-        time.sleep(0.1)
+            time.sleep(self.AUX_SETTLE)
+        else:
+            time.sleep(self.MODE_SWITCH_DELAY)
+        return True
+    
+    def _has_aux(self):
+        """Check whether the AUX pin can be read"""
+        return bool(self.use_gpio and self.gpio is not None and self.aux_pin)
+    
+    def _wait_aux_high(self, timeout=1.0):
+        """Wait for the AUX pin to go HIGH (module idle); returns False on timeout
+        Sleeps until the rising edge instead of polling, so it returns as soon
+        as the module signals ready."""
+        deadline = time.monotonic() + timeout
+        while not self.gpio.read(self.aux_pin):
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            self.gpio.wait_for_edge(self.aux_pin, min(remaining, self.AUX_EDGE_SLICE))
         return True
     
-    def set_mode(self, mode):
-        """Set the module's operating mode"""
+    @_exclusive
+    def set_mode(self, mode, probe=True):
+        """Set the module's operating mode
+        If probe is False the configuration mode check is skipped, for callers
+        that have just probed the module themselves."""
         if self.current_mode == mode:
             logger.debug(f"Module already in {mode} mode")
             return True
             
         # For configuration mode, check if it's already in that mode
-        if mode == ModuleMode.CONFIGURATION and self._check_config_mode():
+        if mode == ModuleMode.CONFIGURATION and probe and self._check_config_mode():
             logger.info("Module already in configuration mode")
             self.current_mode = ModuleMode.CONFIGURATION
             return True
             
         logger.info(f"Setting module to {mode} mode")
+        if self.serial and self.serial.is_open:
+            # Keep data received in the old mode, or drop stale config responses
+            self._clear_input()
         result = self._set_mode_pins(mode)
         if result:
             self.current_mode = mode
             
         return result
     
-    def send_command(self, command, timeout=1):
-        """Send command to the module and receive response"""
+    def _read_frame(self, length, timeout):
+        """Read a response frame of a known length from the module
+        Blocks in serial reads until the last byte arrives or the timeout expires,
+        so a complete frame is returned without any polling delay. The arrival
+        time of the first byte is kept in _first_byte_at for the statistics."""
+        self._first_byte_at = None
+        if length <= 0:
+            return bytearray()
+            
+        # Setting the timeout reconfigures the port (tcsetattr on posix), so only
+        # when it changes; commands normally all use the same one
+        deadline = time.monotonic() + timeout
+        if self.serial.timeout != timeout:
+            self.serial.timeout = timeout
+            
+        # Read the first byte on its own to learn when the module started answering
+        response = bytearray(self.serial.read(1))
+        if not response:
+            return response
+        self._first_byte_at = time.monotonic()
+        
+        if length > 1:
+            if self._fd is not None:
+                self._read_until(response, length, deadline)
+            else:
+                self.serial.timeout = max(0.0, deadline - self._first_byte_at)
+                response.extend(self.serial.read(length - 1))
+            
+        return response
+    
+    def _read_until(self, response, length, deadline):
+        """Read from the port's file descriptor into response until it has length bytes
+        or the deadline (time.monotonic()) passes, without touching the port timeout"""
+        while len(response) < length:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            ready, _, _ = select.select([self._fd], [], [], remaining)
+            if not ready:
+                break
+            data = os.read(self._fd, length - len(response))
+            if not data:
+                # Same as pyserial: readable but empty means the device went away
+                raise serial.SerialException("device reports readiness to read but returned no data")
+            response.extend(data)
+    
+    def _record_stats(self, name, start, sent, response, expected, retry=False):
+        """Record one command attempt that started at start (time.monotonic())"""
+        now = time.monotonic()
+        first_byte_ms = (self._first_byte_at - start) * 1000 if self._first_byte_at else None
+        with self._stats_lock:
+            stats = self.stats.setdefault(name, CommandStats())
+            stats.record(
+                sent,
+                len(response),
+                first_byte_ms=first_byte_ms,
+                last_byte_ms=(now - start) * 1000 if expected else None,
+                timed_out=len(response) < expected,
+                retry=retry
+            )
+    
+    def get_stats(self):
+        """Return the command statistics for this module as a dict"""
+        with self._stats_lock:
+            return {
+                "port": self.port,
+                "commands": {name: stats.as_dict() for name, stats in sorted(self.stats.items())},
+            }
+    
+    def reset_stats(self):
+        """Clear the command statistics"""
+        with self._stats_lock:
+            self.stats = {}
+    
+    def _fill_received(self):
+        """Move everything the port has received into _rx_buffer (lock must be held)"""
+        waiting = self.serial.in_waiting
+        if not waiting:
+            return
+        if self._rx_file is not None:
+            # Read straight into the preallocated buffer; waiting bytes never block
+            self._rx_buffer.fill(self._rx_file.readinto, waiting)
+        else:
+            self._rx_buffer.write(self.serial.read(waiting))
+    
+    def _take_received(self, max_bytes, copy=True):
+        """Remove and return up to max_bytes of received data (lock must be held)
+        With copy=False the data is a shared memoryview into _rx_buffer, which
+        later reads and commands never overwrite (see ReceiveBuffer)."""
+        if copy:
+            return bytes(self._rx_buffer.take(max_bytes))
+        return self._rx_buffer.take(max_bytes, share=True)
+    
+    def _clear_input(self):
+        """Empty the serial input before a command (lock must be held)
+        Outside configuration mode pending bytes are data received over the air, so
+        they are set aside for read_data instead of being flushed. In configuration
+        mode they can only be a late response to an earlier command and are dropped."""
+        if self.current_mode == ModuleMode.CONFIGURATION:
+            self.serial.reset_input_buffer()
+        else:
+            self._fill_received()
+    
+    def discard_input(self):
+        """Drop all received data that has not been read yet"""
+        with self._io_lock:
+            self._rx_buffer.clear()
+            if self.serial and self.serial.is_open:
+                self.serial.reset_input_buffer()
+    
+    @_exclusive
+    def send_command(self, command, timeout=1, response_length=None, retries=0):
+        """Send command to the module and receive response
+        The expected response length is looked up from the command header unless
+        response_length is given; commands without a response return immediately.
+        An incomplete response is retried up to retries more times."""
         if not self.serial or not self.serial.is_open:
             logger.error("Not connected to module")
             return None
             
-        # Clear any pending data
-        self.serial.reset_input_buffer()
-        
-        # Send command
-        logger.debug(f"Sending command: {command.hex()}")
-        self.serial.write(command)
-        
-        # Read response
-        response = bytearray()
-        start_time = time.time()
+        if response_length is None:
+            response_length = RESPONSE_LENGTHS.get(command[0], 0)
+            
+        # Any new command makes a cached probe response stale
+        self._probe_response = None
         
-        while time.time() - start_time < timeout:
-            if self.serial.in_waiting:
-                byte = self.serial.read(1)
-                response.extend(byte)
-                
-                # For E32, responses are typically 6 bytes for parameter gets
-                # But let's wait a bit longer to make sure we get everything
-                if len(response) >= 6 and command[0] == 0xC1:
-                    # For parameter query, we expect exactly 6 bytes
-                    break
-                elif len(response) >= 1 and command[0] in [0xC0, 0xC2, 0xC4]:
-                    # For set parameters, reset, etc., response might be shorter
-                    # or might be the same length as the command
-                    if response[0] == command[0]:
-                        # Wait a bit more to get complete response
-                        time.sleep(0.05)
-                        if self.serial.in_waiting:
-                            response.extend(self.serial.read(self.serial.in_waiting))
-                        break
-                    
-            time.sleep(0.01)
+        for attempt in range(retries + 1):
+            # Clear any pending data (received data is kept for read_data)
+            self._clear_input()
+            
+            # Send command
+            logger.debug(f"Sending command: {command.hex()}")
+            start = time.monotonic()
+            self.serial.write(command)
+            
+            # Read response
+            response = self._read_frame(response_length, timeout)
+            self._record_stats(f"{command[0]:02X}", start, len(command), response, response_length, retry=attempt > 0)
+            
+            if len(response) >= response_length:
+                break
+            if attempt < retries:
+                logger.debug(f"Incomplete response for command {command.hex()}, retrying")
         
         if response:
             logger.debug(f"Response received: {response.hex()}")
-        else:
+        elif response_length:
             logger.warning(f"No response received for command: {command.hex()}")
             
         return response
     
+    def read_data(self, timeout=0.25, max_bytes=4096, copy=True):
+        """Wait for data received over the air and return everything that has arrived
+        Blocks until at least one byte arrives, so data is returned as soon as it is
+        available and no CPU is used while the link is idle. Returns empty bytes if
+        nothing arrives within the timeout or the wait is cancelled.
+        
+        Safe to call from a receive thread while another thread sends commands:
+        the wait itself does not hold the I/O lock, bytes are only read under it,
+        and data received before a command started is returned here first.
+        
+        With copy=False the data may be returned as a memoryview of the receive
+        buffer instead of bytes. Later reads and commands, from any thread, never
+        overwrite it: the buffer is replaced rather than reused while views of it
+        are out. A kept view holds on to the whole buffer (RX_BUFFER_LIMIT bytes),
+        so copy data that is kept for long."""
+        if not self.serial or not self.serial.is_open:
+            return b""
+            
+        deadline = time.monotonic() + timeout
+        if not self._io_lock.acquire(timeout=timeout):
+            return b""
+        try:
+            if self._rx_buffer:
+                return self._take_received(max_bytes, copy)
+        finally:
+            self._io_lock.release()
+            
+        if self._fd is None:
+            return self._read_data_windowed(deadline, max_bytes, copy)
+            
+        wake_fd = self._wake_pipe[0]
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+                
+            # Wait for input without the lock, so commands are never held up
+            try:
+                ready, _, _ = select.select([self._fd, wake_fd], [], [], remaining)
+            except (OSError, ValueError, TypeError):
+                return b""  # Port closed meanwhile
+            if not ready:
+                return b""
+            if wake_fd in ready:
+                os.read(wake_fd, 64)
+                return b""
+                
+            # A command may be running and own these bytes; read only when it is done
+            data = self.read_available(max_bytes, lock_timeout=max(0.0, deadline - time.monotonic()), copy=copy)
+            if data:
+                return data
+            if data is None or not self.serial.is_open:
+                return b""
+            # The bytes were a command response, keep waiting
+    
+    def read_available(self, max_bytes=4096, lock_timeout=-1, copy=True):
+        """Return received data that can be read without waiting for the line
+        Data set aside during a command comes first. Returns None if a command holds
+        the port for longer than lock_timeout seconds (-1 waits as long as it takes),
+        so an event loop watching many ports can retry later instead of blocking.
+        copy=False returns a memoryview, as in read_data."""
+        if not self._io_lock.acquire(timeout=lock_timeout):
+            return None
+        try:
+            if not self.serial or not self.serial.is_open:
+                return b""
+            self._fill_received()
+            return self._take_received(max_bytes, copy)
+        finally:
+            self._io_lock.release()
+    
+    def _read_data_windowed(self, deadline, max_bytes, copy=True):
+        """read_data for ports without a file descriptor (e.g. Windows or loop://)
+        Reads in short windows under the I/O lock, so a command waits at most
+        READ_WINDOW seconds for the receive loop to let go of the port."""
+        self._read_cancelled.clear()
+        while not self._read_cancelled.is_set():
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return b""
+            with self._io_lock:
+                if not self.serial or not self.serial.is_open:
+                    return b""
+                if self._rx_buffer:
+                    return self._take_received(max_bytes, copy)
+                    
+                window = min(self.READ_WINDOW, remaining)
+                if self.serial.timeout != window:
+                    self.serial.timeout = window
+                data = self.serial.read(1)
+                if data:
+                    waiting = self.serial.in_waiting
+                    if waiting and max_bytes > 1:
+                        data += self.serial.read(min(waiting, max_bytes - 1))
+                    return data
+        return b""
+    
+    def cancel_read(self):
+        """Wake up a read_data call that is blocked in another thread"""
+        self._read_cancelled.set()
+        if self._wake_pipe:
+            try:
+                os.write(self._wake_pipe[1], b"\0")
+            except OSError:
+                pass
+    
+    def write_data(self, data):
+        """Write data for transmission over the air
+        The write is serialized with config commands so it cannot land in the
+        middle of a command frame. Returns the number of bytes written."""
+        with self._io_lock:
+            if not self.serial or not self.serial.is_open:
+                logger.error("Not connected to module")
+                return 0
+            return self.serial.write(data)
+    
+    def send_stream(self, stream, air_data_rate=None):
+        """Transmit everything read from a binary stream through the transmit queue
+        Blocks until all of it has been written to the module, paced as described in
+        queue_data. Returns the number of bytes written; raises IOError if writing to
+        the module failed, after the rest of the queue has been discarded."""
+        read = getattr(stream, 'read1', stream.read)  # read1 does not wait for a full block on pipes
+        start = self.bytes_transmitted
+        while self._tx_error is None:
+            block = read(TX_BUFFER_SIZE)
+            if not block or not self.queue_data(block, air_data_rate=air_data_rate):
+                break
+        if not self.wait_transmitted():
+            raise IOError(f"Transmit failed after {self.bytes_transmitted - start} bytes")
+        return self.bytes_transmitted - start
+    
+    def queue_data(self, data, air_data_rate=None, timeout=None):
+        """Queue data for transmission over the air without waiting for it to be sent
+        A worker thread writes the queue in SUB_PACKET_SIZE chunks, each one only once
+        the module's transmit buffer has room for it: with an AUX pin, every burst of up
+        to TX_BUFFER_SIZE bytes waits for AUX to report the module idle; otherwise a model
+        of the buffer draining at the air data rate keeps at most half of it filled, so
+        that radio overhead does not cause an overrun. The rate is air_data_rate (bits per
+        second, kept for later calls), else the one last read from the module, else the
+        factory default 2.4k. Nothing is written while the module is in configuration mode.
+        Blocks while TX_QUEUE_LIMIT bytes are already queued. Returns the number of bytes
+        queued (0 if not connected or if timeout seconds pass first)."""
+        if not self.serial or not self.serial.is_open:
+            logger.error("Not connected to module")
+            return 0
+        if not data:
+            return 0
+            
+        view = memoryview(bytes(data))
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._tx_cond:
+            if air_data_rate:
+                self._tx_rate = air_data_rate
+            while self._tx_queued >= self.TX_QUEUE_LIMIT:
+                remaining = None if deadline is None else deadline - time.monotonic()
+                if remaining is not None and remaining <= 0:
+                    return 0
+                self._tx_cond.wait(remaining)
+                
+            self._tx_queue.append(view)
+            self._tx_queued += len(view)
+            if self._tx_thread is None:
+                self._tx_stopping = False
+                self._tx_thread = threading.Thread(target=self._transmit_worker, daemon=True)
+                self._tx_thread.start()
+            self._tx_cond.notify_all()
+        return len(view)
+    
+    @property
+    def tx_pending(self):
+        """Bytes queued for transmission that have not been written to the module yet"""
+        with self._tx_cond:
+            return self._tx_queued + self._tx_in_flight
+    
+    def wait_transmitted(self, timeout=None):
+        """Wait until the transmit queue has been written to the module; False on timeout
+        Also False if a write failed since the last call (the error is logged and the
+        queue discarded). The module may still be sending the last of it over the air
+        (AUX stays LOW)."""
+        with self._tx_cond:
+            if not self._tx_cond.wait_for(lambda: not self._tx_queue and not self._tx_in_flight, timeout):
+                return False
+            error, self._tx_error = self._tx_error, None
+            return error is None
+    
+    def _stop_transmit(self):
+        """Stop the transmit worker, dropping anything still queued"""
+        with self._tx_cond:
+            thread = self._tx_thread
+            if thread is None:
+                return
+            if self._tx_queued or self._tx_in_flight:
+                logger.warning(f"Discarding {self._tx_queued + self._tx_in_flight} bytes not yet transmitted")
+            self._tx_stopping = True
+            self._tx_queue.clear()
+            self._tx_queued = 0
+            self._tx_error = None
+            self._tx_cond.notify_all()
+        if thread is not threading.current_thread():
+            thread.join()
+        self._tx_rate = None
+    
+    def _transmit_worker(self):
+        """Write the transmit queue to the module as its buffer has room
+        A write error (e.g. an unplugged adapter) discards the queue and ends the
+        worker; the next queue_data starts a new one."""
+        try:
+            self._transmit_queue()
+        except OSError as e:  # Includes serial.SerialException
+            with self._tx_cond:
+                logger.error(f"Transmit failed: {e}, discarding {self._tx_queued + self._tx_in_flight} bytes")
+                self._tx_error = e
+                self._tx_queue.clear()
+                self._tx_queued = 0
+        finally:
+            with self._tx_cond:
+                self._tx_in_flight = 0
+                self._tx_thread = None
+                self._tx_cond.notify_all()
+    
+    def _transmit_queue(self):
+        """Loop of the transmit worker, returning when it is stopped"""
+        while True:
+            with self._tx_cond:
+                while not self._tx_queue and not self._tx_stopping:
+                    self._tx_cond.wait()
+                if self._tx_stopping:
+                    break
+                    
+                # Next chunk, joining small queued writes into one sub-packet
+                chunk = bytearray()
+                while self._tx_queue and len(chunk) < SUB_PACKET_SIZE:
+                    view = self._tx_queue[0]
+                    need = SUB_PACKET_SIZE - len(chunk)
+                    chunk += view[:need]
+                    if len(view) > need:
+                        self._tx_queue[0] = view[need:]
+                    else:
+                        self._tx_queue.popleft()
+                self._tx_queued -= len(chunk)
+                self._tx_in_flight = len(chunk)
+                self._tx_cond.notify_all()
+                
+            self._wait_transmit_room(len(chunk))
+            written = self._write_transmit_chunk(chunk)
+            
+            with self._tx_cond:
+                self._tx_in_flight = 0
+                self.bytes_transmitted += written
+                if written < len(chunk) and not self._tx_stopping:
+                    logger.error(f"Transmit failed, discarding {self._tx_queued + len(chunk) - written} bytes")
+                    self._tx_error = IOError("Not connected to module")
+                    self._tx_queue.clear()
+                    self._tx_queued = 0
+                self._tx_cond.notify_all()
+    
+    def _transmit_rate(self):
+        """Air data rate in bits per second used to pace the transmit queue without AUX"""
+        if self._tx_rate:
+            return self._tx_rate
+        registers = self._registers
+        if registers is not None:
+            return AIR_DATA_RATES[registers[2] & 0x07]
+        return AIR_DATA_RATES[2]  # Factory default
+    
+    def _wait_transmit_room(self, length):
+        """Sleep until the module's transmit buffer can take length more bytes
+        Returns early if the transmit worker is being stopped."""
+        if self._has_aux():
+            if self._tx_burst + length > TX_BUFFER_SIZE:
+                busy_deadline = time.monotonic() + self.AUX_BUSY_DELAY
+                while self.gpio.read(self.aux_pin) and time.monotonic() < busy_deadline:
+                    time.sleep(0.001)
+                deadline = time.monotonic() + 10
+                while not self._wait_aux_high(timeout=self.TX_HOLD_RETRY):
+                    if self._tx_stopping:
+                        return
+                    if time.monotonic() >= deadline:
+                        logger.warning("Timeout waiting for AUX pin to go HIGH")
+                        break
+                self._tx_burst = 0
+            self._tx_burst += length
+            return
+            
+        bytes_per_second = self._transmit_rate() / 8.0
+        limit = TX_BUFFER_SIZE // 2
+        now = time.monotonic()
+        buffered = max(0.0, self._tx_buffered - (now - self._tx_updated) * bytes_per_second)
+        if buffered + length > limit:
+            with self._tx_cond:
+                if self._tx_cond.wait_for(lambda: self._tx_stopping, (buffered + length - limit) / bytes_per_second):
+                    return
+            buffered = limit - length
+            now = time.monotonic()
+        self._tx_buffered = buffered + length
+        self._tx_updated = now
+    
+    def _write_transmit_chunk(self, chunk):
+        """Write a chunk from the transmit queue, holding it while in configuration mode"""
+        while True:
+            if self._tx_stopping:
+                return 0
+            with self._io_lock:
+                if not self.serial or not self.serial.is_open:
+                    return 0
+                if self.current_mode != ModuleMode.CONFIGURATION:
+                    port = self.serial
+                    written = port.write(chunk)
+                    break
+            with self._tx_cond:
+                self._tx_cond.wait(self.TX_HOLD_RETRY)
+                
+        # Wait until the chunk has left the UART so the model starts from the right time
+        # (outside the lock, so the receive side is not held up meanwhile)
+        port.flush()
+        return written
+    
+    @_exclusive
     def enter_config_mode(self):
         """Enter configuration mode for sending commands"""
+        # Inside a config session the module stays in configuration mode
+        if self._session_depth and self.current_mode == ModuleMode.CONFIGURATION:
+            return True
+            
         # First check if the module is already in configuration mode
         if self._check_config_mode():
             logger.info("Module already in configuration mode")
             self.current_mode = ModuleMode.CONFIGURATION
             return True
-        # If not, try to set the mode using pins
-        return self.set_mode(ModuleMode.CONFIGURATION)
+        # If not, try to set the mode using pins (the probe above already failed)
+        return self.set_mode(ModuleMode.CONFIGURATION, probe=False)
         
+    @_exclusive
     def _check_config_mode(self):
         """Check if the module is already in configuration mode
-        Returns True if the module is in configuration mode, False otherwise"""
+        Returns True if the module is in configuration mode, False otherwise.
+        A valid response is kept in _probe_response for get_parameters to reuse."""
+        self._probe_response = None
         if not self.serial or not self.serial.is_open:
             return False
             
         # Send a simple query command (get parameters)
         try:
-            # Clear any pending data
-            self.serial.reset_input_buffer()
+            # Clear any pending data (received data is kept for read_data)
+            self._clear_input()
             
             # Send the command to read parameters
             command = bytes([0xC1, 0xC1, 0xC1])
+            start = time.monotonic()
             self.serial.write(command)
             
-            # Wait for response
-            start_time = time.time()
-            response = bytearray()
-            
-            # Wait up to 0.5 seconds for response
-            while (time.time() - start_time) < 0.5:
-                if self.serial.in_waiting:
-                    byte = self.serial.read(1)
-                    response.extend(byte)
-                    
-                    # If we have 6 bytes, check if valid
-                    if len(response) >= 6:
-                        break
-                        
-                time.sleep(0.01)
+            # Wait up to 0.5 seconds for the 6-byte parameter frame
+            response = self._read_frame(RESPONSE_LENGTHS[0xC1], 0.5)
+            self._record_stats("probe", start, len(command), response, RESPONSE_LENGTHS[0xC1])
             
             # Check if response starts with C1 or C0 (valid response to parameter query)
             if response and len(response) >= 6:
                 if response[0] == 0xC1:
                     logger.info("Configuration mode verified - received valid C1 response")
+                    self._probe_response = bytes(response)
+                    self._registers = bytes(response[1:6])
                     return True
                 elif response[0] == 0xC0:
                     # Some E32 modules might respond with C0 instead of C1
                     logger.info("Configuration mode verified - received valid C0 response")
+                    self._probe_response = bytes(response)
+                    self._registers = bytes(response[1:6])
                     return True
                     
             logger.debug(f"No valid configuration mode response: {response.hex() if response else 'No data'}")
@@ -273,8 +1276,16 @@ class E32Module:
             
         return False
     
+    @_exclusive
     def exit_config_mode(self):
         """Exit configuration mode and return to normal mode"""
+        self._probe_response = None
+        
+        # A config session leaves configuration mode once, when it ends
+        if self._session_depth:
+            logger.debug("Staying in configuration mode until the config session ends")
+            return True
+            
         # If using manual configuration, don't exit config mode
         if hasattr(self, 'manual_config') and self.manual_config:
             logger.info("Not exiting configuration mode - manual configuration is enabled")
@@ -282,65 +1293,238 @@ class E32Module:
             
         return self.set_mode(ModuleMode.NORMAL)
     
+    @contextmanager
+    def config_session(self):
+        """Keep the module in configuration mode for a group of operations
+        Configuration mode is entered once when the session starts and left once
+        when it ends, instead of around every get_parameters, set_parameters,
+        reset_module or version call. Sessions can be nested, and other threads
+        cannot use the port until the session ends. The context value is True if
+        configuration mode was entered successfully.
+        
+        Example:
+            with module.config_session() as ready:
+                if ready:
+                    module.set_parameters(params)
+                    params = module.get_parameters()
+                    info = module.version()
+        """
+        # The receive loop is paused for the whole session
+        with self._io_lock:
+            if self._session_depth == 0:
+                self._session_ready = self.enter_config_mode()
+            self._session_depth += 1
+            
+            try:
+                yield self._session_ready
+            finally:
+                self._session_depth -= 1
+                if self._session_depth == 0 and self._session_ready:
+                    self._session_ready = False
+                    if not (hasattr(self, 'manual_config') and self.manual_config):
+                        self.exit_config_mode()
+    
+    def cached_parameters(self):
+        """Return the parameters from the shadow copy of the registers, without serial I/O
+        Returns None if nothing has been read or written since the cache was invalidated."""
+        registers = self._registers
+        if registers is None:
+            return None
+        return self._decode_registers(registers)
+    
+    def invalidate_registers(self):
+        """Forget the shadow copy of the module registers
+        The next partial set_parameters call will read them from the module again."""
+        self._registers = None
+    
+    @staticmethod
+    def _decode_registers(registers):
+        """Decode the five register bytes (ADDH, ADDL, SPED, CHAN, OPTION) into a parameter dict"""
+        params = {}
+        params["addh"] = registers[0]
+        params["addl"] = registers[1]
+        params["sped"] = registers[2]
+        params["chan"] = registers[3]
+        params["option"] = registers[4]
+        
+        # Calculate derived parameters
+        params["address"] = (params["addh"] << 8) + params["addl"]
+        
+        # Parse SPED byte
+        params["parity"] = (params["sped"] >> 6) & 0x03
+        params["uart_baud"] = (params["sped"] >> 3) & 0x07
+        params["air_data_rate"] = params["sped"] & 0x07
+        
+        # Parse OPTION byte
+        params["fixed_transmission"] = (params["option"] >> 7) & 0x01
+        params["io_drive_mode"] = (params["option"] >> 6) & 0x01
+        params["wake_up_time"] = (params["option"] >> 3) & 0x07
+        params["fec"] = (params["option"] >> 2) & 0x01
+        params["transmission_power"] = params["option"] & 0x03
+        
+        # Calculate frequency (for 915MHz version base + channel*1MHz)
+        params["frequency"] = 915 + params["chan"]
+        
+        return params
+    
+    @staticmethod
+    def _parse_parameters(response):
+        """Decode a 6-byte parameter frame (C0 or C1 header) into a parameter dict
+        Returns None if the frame is too short or has an unexpected header."""
+        if not response or len(response) < 6:
+            logger.error(f"Invalid response when reading parameters: {response.hex() if response else 'None'}")
+            return None
+            
+        # The module should respond with a C1 followed by parameters
+        # However, some E32 modules might respond with C0 followed by parameters instead
+        if response[0] == 0xC1:
+            # Standard response format
+            logger.info("Received standard C1 response format")
+        elif response[0] == 0xC0:
+            # Alternative response format (some modules respond with C0)
+            logger.info("Received alternative C0 response format")
+        else:
+            logger.error(f"Invalid response header when reading parameters: {response.hex()}")
+            return None
+            
+        return E32Module._decode_registers(response[1:6])
+    
+    @staticmethod
+    def _covers_all_registers(params):
+        """Check whether params sets every register bit, so no current value is needed"""
+        has_address = "address" in params or ("addh" in params and "addl" in params)
+        has_sped = "sped" in params or all(
+            key in params for key in ("parity", "uart_baud", "air_data_rate")
+        )
+        has_option = "option" in params or all(
+            key in params for key in ("fixed_transmission", "io_drive_mode", "wake_up_time", "fec", "transmission_power")
+        )
+        return has_address and has_sped and "chan" in params and has_option
+    
+    @staticmethod
+    def _encode_registers(params, base=None):
+        """Merge params into the register bytes in base and return the five new register bytes
+        Fields missing from params keep their value from base (zero if there is no base).
+        Raw "sped" and "option" bytes are applied before the individual fields they hold."""
+        registers = bytearray(base) if base is not None else bytearray(5)
+        
+        # Set address bytes
+        if "addh" in params:
+            registers[0] = params["addh"] & 0xFF
+        if "addl" in params:
+            registers[1] = params["addl"] & 0xFF
+        if "address" in params:
+            address = params["address"]
+            registers[0] = (address >> 8) & 0xFF  # ADDH
+            registers[1] = address & 0xFF         # ADDL
+        
+        # Set SPED byte (parity, UART baud rate, air data rate)
+        sped = params["sped"] & 0xFF if "sped" in params else registers[2]
+        if "parity" in params:
+            sped = (sped & ~0xC0) | ((params["parity"] & 0x03) << 6)
+        if "uart_baud" in params:
+            sped = (sped & ~0x38) | ((params["uart_baud"] & 0x07) << 3)
+        if "air_data_rate" in params:
+            sped = (sped & ~0x07) | (params["air_data_rate"] & 0x07)
+        registers[2] = sped
+        
+        # Set CHAN byte (channel)
+        if "chan" in params:
+            registers[3] = params["chan"] & 0xFF
+        
+        # Set OPTION byte (fixed transmission, IO drive mode, wake-up time, FEC, transmission power)
+        option = params["option"] & 0xFF if "option" in params else registers[4]
+        if "fixed_transmission" in params:
+            option = (option & ~0x80) | ((params["fixed_transmission"] & 0x01) << 7)
+        if "io_drive_mode" in params:
+            option = (option & ~0x40) | ((params["io_drive_mode"] & 0x01) << 6)
+        if "wake_up_time" in params:
+            option = (option & ~0x38) | ((params["wake_up_time"] & 0x07) << 3)
+        if "fec" in params:
+            option = (option & ~0x04) | ((params["fec"] & 0x01) << 2)
+        if "transmission_power" in params:
+            option = (option & ~0x03) | (params["transmission_power"] & 0x03)
+        registers[4] = option
+        
+        return registers
+    
+    @staticmethod
+    def _needs_current_registers(params, base, skip_unchanged):
+        """Check whether set_parameters has to read the registers before writing params"""
+        return base is None and (skip_unchanged or not E32Module._covers_all_registers(params))
+    
+    @staticmethod
+    def _plan_write(params, base, skip_unchanged, persist, volatile):
+        """Return the command that writes params over the registers base, or None to skip it
+        The write is only skipped with skip_unchanged when base already holds the values,
+        and never when it would persist values after a C2 write (volatile). Raises
+        ValueError for a partial update when base is unknown. AsyncE32Module plans its
+        writes here too."""
+        if base is None and not E32Module._covers_all_registers(params):
+            raise ValueError("Cannot read current parameters to merge a partial update")
+        registers = E32Module._encode_registers(params, base)
+        if skip_unchanged and registers == base and not (persist and volatile):
+            return None
+        # C0 saves the parameters to flash, C2 only applies them until the next reset
+        return bytes([0xC0 if persist else 0xC2]) + bytes(registers)
+    
+    @staticmethod
+    def _write_result(command, response, volatile):
+        """Return the shadow registers and volatile flag after a write command got response
+        The registers are None (read again when next needed) unless the module confirmed
+        the write: without a response it may never have received it."""
+        persist = command[0] == 0xC0
+        # Some modules return C0 followed by parameters, some just return nothing
+        if not response:
+            logger.info("No response from module after setting parameters (this is normal for some modules)")
+            return None, volatile or not persist
+        if response[0] not in (0xC0, 0xC2, 0xFF):
+            # Still considered successful since some modules don't respond properly,
+            # but the shadow copy can no longer be trusted
+            logger.warning(f"Unexpected response when setting parameters: {response.hex()}")
+            return None, volatile or not persist
+        logger.info(f"Successfully set parameters, response: {response.hex()}")
+        return bytes(command[1:6]), not persist
+    
+    @_exclusive
+    def _read_registers(self):
+        """Read the five register bytes from the module (must be in configuration mode)
+        Updates the shadow copy and returns it, or returns None on failure."""
+        # The config mode probe is itself a parameter read, so reuse its
+        # response when we have one instead of sending C1C1C1 again
+        response = self._probe_response
+        self._probe_response = None
+        
+        if response is None:
+            # Send command to read parameters (C1C1C1)
+            command = bytes([0xC1, 0xC1, 0xC1])
+            response = self.send_command(command, retries=self.READ_RETRIES)
+        else:
+            logger.debug("Using parameter frame from config mode probe")
+            
+        if self._parse_parameters(response) is None:
+            self.invalidate_registers()
+            return None
+            
+        self._registers = bytes(response[1:6])
+        return self._registers
+    
+    @_exclusive
     def get_parameters(self):
         """Read all parameters from the module"""
         if not self.enter_config_mode():
             return None
             
-        params = {}
+        params = None
         
         try:
-            # Send command to read parameters (C1C1C1)
-            command = bytes([0xC1, 0xC1, 0xC1])
-            response = self.send_command(command)
-            
-            # The module should respond with a C1 followed by parameters
-            # However, some E32 modules might respond with C0 followed by parameters instead
-            if response and len(response) >= 6:
-                if response[0] == 0xC1:
-                    # Standard response format
-                    logger.info("Received standard C1 response format")
-                    params["addh"] = response[1]
-                    params["addl"] = response[2]
-                    params["sped"] = response[3]
-                    params["chan"] = response[4]
-                    params["option"] = response[5]
-                elif response[0] == 0xC0:
-                    # Alternative response format (some modules respond with C0)
-                    logger.info("Received alternative C0 response format")
-                    params["addh"] = response[1]
-                    params["addl"] = response[2]
-                    params["sped"] = response[3]
-                    params["chan"] = response[4]
-                    params["option"] = response[5]
-                else:
-                    logger.error(f"Invalid response header when reading parameters: {response.hex() if response else 'None'}")
-                    return None
-                
-                # Calculate derived parameters
-                params["address"] = (params["addh"] << 8) + params["addl"]
-                
-                # Parse SPED byte
-                params["parity"] = (params["sped"] >> 6) & 0x03
-                params["uart_baud"] = (params["sped"] >> 3) & 0x07
-                params["air_data_rate"] = params["sped"] & 0x07
-                
-                # Parse OPTION byte
-                params["fixed_transmission"] = (params["option"] >> 7) & 0x01
-                params["io_drive_mode"] = (params["option"] >> 6) & 0x01
-                params["wake_up_time"] = (params["option"] >> 3) & 0x07
-                params["fec"] = (params["option"] >> 2) & 0x01
-                params["transmission_power"] = params["option"] & 0x03
-                
-                # Calculate frequency (for 915MHz version base + channel*1MHz)
-                params["frequency"] = 915 + params["chan"]
-                
-            else:
-                logger.error(f"Invalid response when reading parameters: {response.hex() if response else 'None'}")
-                return None
+            registers = self._read_registers()
+            if registers is not None:
+                params = self._decode_registers(registers)
                 
         except Exception as e:
             logger.error(f"Error reading parameters: {e}")
+            self.invalidate_registers()
             params = None
             
         # Don't exit configuration mode if we are using manual configuration
@@ -354,78 +1538,58 @@ class E32Module:
             
         return params
     
-    def set_parameters(self, params):
-        """Write parameters to the module"""
+    @_exclusive
+    def set_parameters(self, params, skip_unchanged=False, persist=True):
+        """Write parameters to the module
+        Fields missing from params keep their current value. The current registers
+        come from the shadow copy of the last read or write, and are only read
+        from the module when nothing is cached and params is not complete.
+        
+        With skip_unchanged=True the write is skipped when the module already holds
+        the requested values, which saves a round-trip and a flash write. Whether
+        the write happened is reported in last_write_skipped. The comparison is with
+        the values the module is running, so after a C2 write through this object a
+        persistent write is never skipped until a C0 write or reset. A C1 read cannot
+        tell running values from saved ones: a C2 write made before this object was
+        created (or by another program) goes unnoticed and can make a persistent
+        write look unchanged.
+        
+        With persist=False the parameters are sent with the C2 header: they take
+        effect immediately but are not saved to flash, so they are lost on reset
+        or power cycle. This is faster and avoids flash wear for frequent changes.
+        
+        A write the module does not answer still returns True, as some modules never
+        answer, but the shadow copy is dropped so later merges and skip_unchanged
+        comparisons read the registers back instead of trusting the unconfirmed values."""
+        self.last_write_skipped = False
+        
         if not self.enter_config_mode():
             return False
             
         success = True
         
         try:
-            # Prepare the command bytes
-            command = bytearray(6)
-            command[0] = 0xC0  # Command header for setting parameters
-            
-            # Set address bytes
-            if "address" in params:
-                address = params["address"]
-                command[1] = (address >> 8) & 0xFF  # ADDH
-                command[2] = address & 0xFF         # ADDL
-            elif "addh" in params and "addl" in params:
-                command[1] = params["addh"]
-                command[2] = params["addl"]
-            else:
-                # Use defaults if not specified
-                command[1] = 0x00
-                command[2] = 0x00
-            
-            # Set SPED byte (parity, UART baud rate, air data rate)
-            sped = 0
-            if "parity" in params:
-                sped |= (params["parity"] & 0x03) << 6
-            if "uart_baud" in params:
-                sped |= (params["uart_baud"] & 0x07) << 3
-            if "air_data_rate" in params:
-                sped |= params["air_data_rate"] & 0x07
-            command[3] = sped
-            
-            # Set CHAN byte (channel)
-            if "chan" in params:
-                command[4] = params["chan"] & 0xFF
-            else:
-                # For 915MHz, use channel 0 (915MHz) as default
-                command[4] = 0x00
-            
-            # Set OPTION byte (fixed transmission, IO drive mode, wake-up time, FEC, transmission power)
-            option = 0
-            if "fixed_transmission" in params:
-                option |= (params["fixed_transmission"] & 0x01) << 7
-            if "io_drive_mode" in params:
-                option |= (params["io_drive_mode"] & 0x01) << 6
-            if "wake_up_time" in params:
-                option |= (params["wake_up_time"] & 0x07) << 3
-            if "fec" in params:
-                option |= (params["fec"] & 0x01) << 2
-            if "transmission_power" in params:
-                option |= params["transmission_power"] & 0x03
-            command[5] = option
-            
-            # Send the command
-            response = self.send_command(command)
-            
-            # Check if the response is valid
-            # Some modules return C0 followed by parameters, some just return nothing
-            if not response:
-                # No response is common for set parameters, we'll consider it successful
-                logger.info("No response from module after setting parameters (this is normal for some modules)")
-            elif len(response) < 1 or (response[0] != 0xC0 and response[0] != 0xFF):
-                logger.warning(f"Unexpected response when setting parameters: {response.hex() if response else 'None'}")
-                # We'll still consider it successful since some modules don't respond properly
+            base = self._registers
+            if self._needs_current_registers(params, base, skip_unchanged):
+                # Nothing cached: fetch the current registers
+                # (free if enter_config_mode has just probed the module)
+                base = self._read_registers()
+                
+            command = self._plan_write(params, base, skip_unchanged, persist, self._registers_volatile)
+            if command is None:
+                logger.info("Module parameters already match, write skipped")
+                self.last_write_skipped = True
             else:
-                logger.info(f"Successfully set parameters, response: {response.hex()}")
+                response = self.send_command(command)
+                registers, self._registers_volatile = self._write_result(command, response, self._registers_volatile)
+                if registers is None:
+                    self.invalidate_registers()
+                else:
+                    self._registers = registers
             
         except Exception as e:
             logger.error(f"Error setting parameters: {e}")
+            self.invalidate_registers()
             success = False
             
         # Don't exit config mode if manual configuration is enabled
@@ -434,6 +1598,7 @@ class E32Module:
             
         return success
     
+    @_exclusive
     def reset_module(self):
         """Reset the module"""
         if not self.enter_config_mode():
@@ -444,6 +1609,10 @@ class E32Module:
             command = bytes([0xC4, 0xC4, 0xC4])
             response = self.send_command(command)
             
+            # The module reloads its saved parameters, so the shadow copy is stale
+            self.invalidate_registers()
+            self._registers_volatile = False
+            
             # For reset, we don't expect a specific response, but the module should reset
             # Wait a bit to allow the module to complete the reset
             time.sleep(1)
@@ -452,10 +1621,12 @@ class E32Module:
             return True
         except Exception as e:
             logger.error(f"Error resetting module: {e}")
+            self.invalidate_registers()
             return False
         finally:
             self.exit_config_mode()
     
+    @_exclusive
     def factory_reset(self):
         """Reset the module to factory defaults"""
         # For E32, we can set the default parameters
@@ -469,6 +1640,7 @@ class E32Module:
         
         return self.set_parameters(default_params)
             
+    @_exclusive
     def version(self):
         """Get module version"""
         if not self.enter_config_mode():
@@ -477,7 +1649,7 @@ class E32Module:
         try:
             # Send version command (C3C3C3)
             command = bytes([0xC3, 0xC3, 0xC3])
-            response = self.send_command(command)
+            response = self.send_command(command, retries=self.READ_RETRIES)
             
             if response and len(response) >= 4 and response[0] == 0xC3:
                 # Extract version information
@@ -496,10 +1668,255 @@ class E32Module:
         finally:
             self.exit_config_mode()
 
+class ReceiveHistory:
+    """
+    Byte-bounded, thread-safe ring buffer of received data
+    The most recent max_bytes are kept in one bytearray allocated up front, so
+    memory stays at max_bytes however small the received chunks are. Positions
+    count the bytes appended since the last clear; readers follow the stream by
+    passing the position they got back from read_from.
+    """
+    def __init__(self, max_bytes=8 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self.total = 0      # Bytes appended since the last clear
+        self.chunks = 0     # Chunks appended since the last clear
+        self._ring = bytearray(max_bytes)
+        self._lock = threading.Lock()
+        
+    @property
+    def size(self):
+        """Bytes currently kept"""
+        return min(self.total, self.max_bytes)
+        
+    @property
+    def dropped_bytes(self):
+        """Oldest bytes overwritten since the last clear"""
+        return max(0, self.total - self.max_bytes)
+        
+    def append(self, data):
+        """Add a received chunk, overwriting the oldest data once the ring is full"""
+        view = memoryview(data).cast('B')
+        length = len(view)
+        if length > self.max_bytes:
+            view = view[length - self.max_bytes:]
+        with self._lock:
+            offset = (self.total + length - len(view)) % self.max_bytes
+            first = min(len(view), self.max_bytes - offset)
+            self._ring[offset:offset + first] = view[:first]
+            self._ring[:len(view) - first] = view[first:]
+            self.total += length
+            self.chunks += 1
+            
+    def clear(self):
+        """Forget all data"""
+        with self._lock:
+            self.total = 0
+            self.chunks = 0
+            
+    def read_from(self, position):
+        """Return the data appended since position (as much of it as is still kept)
+        and the position to continue from. A position past the end, left over from
+        before a clear, reads from the start."""
+        with self._lock:
+            if position > self.total:
+                position = 0
+            start = max(position, self.total - self.max_bytes)
+            offset = start % self.max_bytes
+            length = self.total - start
+            first = min(length, self.max_bytes - offset)
+            data = bytes(self._ring[offset:offset + first]) + bytes(self._ring[:length - first])
+            return data, self.total
+            
+    def getvalue(self):
+        """Return the retained data as one bytes object"""
+        return self.read_from(0)[0]
+
+class ReceiveMultiplexer:
+    """
+    Receives from many connected E32Module instances on one thread
+    The modules' serial file descriptors are watched with one selector (epoll on
+    Linux, kqueue on BSD/macOS), so the loop sleeps until one of them has data and
+    its cost grows with traffic rather than with the number of modules (posix only,
+    like the descriptor wait in read_data). Received data is reported as
+    (port, timestamp, data) events, timestamped with time.monotonic().
+    
+    With copy=False the data of each event is a memoryview into the module's
+    receive buffer rather than a new bytes object. It is never overwritten (see
+    read_data), but keeps the whole buffer alive, so copy data that is kept.
+    
+    A module is dropped when its port is closed or reading it fails (e.g. the
+    adapter was unplugged): the error is logged and on_lost(module, reason) is
+    called from poll, so the caller can reconnect it and add() it again.
+    
+    Example:
+        multiplexer = ReceiveMultiplexer(modules)
+        for port, timestamp, data in multiplexer:
+            print(port, timestamp, data.hex())
+    """
+    # How long a module whose port is busy with a command is left out of the wait
+    BUSY_RETRY = 0.01
+    
+    # How often watched modules are checked for ports closed by disconnect(),
+    # which the selector itself does not report
+    CHECK_INTERVAL = 1.0
+    
+    def __init__(self, modules=(), copy=True, on_lost=None):
+        self.copy = copy
+        self.on_lost = on_lost
+        self._selector = selectors.DefaultSelector()
+        self._wake_r, self._wake_w = os.pipe()
+        os.set_blocking(self._wake_r, False)
+        self._selector.register(self._wake_r, selectors.EVENT_READ)
+        self._busy = []      # Modules left out of the wait until a command releases them
+        self._fds = {}       # (descriptor, serial port) each watched module is registered with
+        self._next_check = 0.0
+        self._stopped = False
+        for module in modules:
+            self.add(module)
+            
+    def add(self, module):
+        """Start watching a connected module; returns False if its port has no file descriptor"""
+        if module._fd is None:
+            logger.error(f"Cannot watch {module.port}: the port has no file descriptor")
+            return False
+        # The first poll collects anything already received, then starts watching it
+        self._busy.append(module)
+        return True
+        
+    def remove(self, module):
+        """Stop watching a module"""
+        if module in self._busy:
+            self._busy.remove(module)
+        fd, port = self._fds.pop(module, (None, None))
+        if fd is not None:
+            try:
+                self._selector.unregister(fd)
+            except (KeyError, ValueError):
+                pass
+                
+    def stop(self):
+        """Make a poll in another thread return, and end iteration"""
+        self._stopped = True
+        os.write(self._wake_w, b"\0")
+        
+    def close(self):
+        """Release the selector and the wake pipe (the modules stay connected)"""
+        self._selector.close()
+        os.close(self._wake_r)
+        os.close(self._wake_w)
+        
+    def _drop(self, module, reason):
+        """Stop watching a module whose port is gone and tell the caller"""
+        logger.error(f"No longer receiving from {module.port}: {reason}")
+        self.remove(module)
+        if self.on_lost:
+            self.on_lost(module, reason)
+            
+    def _port_closed(self, module):
+        """True if module's port was closed, or reopened, since it was registered"""
+        if module._fd is None or not module.serial or not module.serial.is_open:
+            return True
+        registered = self._fds.get(module)
+        return registered is not None and registered != (module._fd, module.serial)
+        
+    def _read(self, module, events, now):
+        """Add what module has received to events
+        Returns False if a command holds the port, None if the module was dropped."""
+        if self._port_closed(module):
+            self._drop(module, "port closed")
+            return None
+        try:
+            data = module.read_available(lock_timeout=0, copy=self.copy)
+        except OSError as e:  # Includes serial.SerialException
+            self._drop(module, str(e))
+            return None
+        if data is None:
+            return False
+        if data:
+            events.append((module.port, now, data))
+        return True
+        
+    def _check_ports(self, now):
+        """Drop watched modules whose port has been closed since they were added"""
+        self._next_check = now + self.CHECK_INTERVAL
+        for module in list(self._fds):
+            if self._port_closed(module):
+                self._drop(module, "port closed")
+                
+    def poll(self, timeout=None):
+        """Wait up to timeout seconds (None: until data or stop) and return the events"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            events, woken = self._poll_once(deadline)
+            if events or woken or (deadline is not None and time.monotonic() >= deadline):
+                return events
+                
+    def _poll_once(self, deadline):
+        """One wait of poll; returns the events and whether stop() woke it up"""
+        events = []
+        now = time.monotonic()
+        if now >= self._next_check:
+            self._check_ports(now)
+            
+        # Give modules that were busy with a command another try
+        if self._busy:
+            busy, self._busy = self._busy, []
+            for module in busy:
+                result = self._read(module, events, now)
+                if result:
+                    self._fds[module] = (module._fd, module.serial)
+                    self._selector.register(module._fd, selectors.EVENT_READ, module)
+                elif result is not None:
+                    self._busy.append(module)
+            if events:
+                return events, False
+                
+        timeout = self._next_check - now
+        if self._busy:
+            timeout = min(timeout, self.BUSY_RETRY)
+        if deadline is not None:
+            timeout = min(timeout, deadline - now)
+        ready = self._selector.select(max(timeout, 0))
+        now = time.monotonic()
+        woken = False
+        for key, mask in ready:
+            module = key.data
+            if module is None:
+                try:
+                    os.read(self._wake_r, 64)
+                except BlockingIOError:
+                    pass
+                woken = True
+                continue
+            if module not in self._fds:
+                continue  # Dropped while handling an earlier key
+            result = self._read(module, events, now)
+            if result is False:
+                # A command owns the port right now; don't wake up for its response
+                self._selector.unregister(key.fd)
+                del self._fds[module]
+                self._busy.append(module)
+        return events, woken
+        
+    def __iter__(self):
+        """Yield (port, timestamp, data) events until stop() is called"""
+        self._stopped = False
+        while not self._stopped:
+            for event in self.poll():
+                yield event
+
 class E32ConfigGUI:
     """
     GUI interface for configuring the E32 module
     """
+    # Interval at which received data is flushed into the Monitor tab (milliseconds)
+    RECEIVE_FRAME_MS = 50
+    
+    # Lines kept in the received data view; older lines are trimmed in bulk
+    # once the view grows RECEIVE_TRIM_LINES past the limit
+    RECEIVE_MAX_LINES = 2000
+    RECEIVE_TRIM_LINES = 200
+    
     def __init__(self, master):
         self.master = master
         self.master.title("E32-915MHz LoRa Module Configurator")
@@ -509,6 +1926,22 @@ class E32ConfigGUI:
         # Module instance
         self.module = None
         
+        # Full received data, bounded in memory, plus an optional capture file.
+        # The receive thread appends to the history; the Tk thread shows what was
+        # appended since _receive_position (and _receive_chunks) on every frame tick.
+        self.receive_history = ReceiveHistory()
+        self._receive_position = 0
+        self._receive_chunks = 0
+        self._receive_drain_scheduled = False
+        self._capture_file = None
+        
+        # Serial operations run one at a time on this worker so the Tk thread never blocks;
+        # buttons in _module_buttons are disabled while one is in flight
+        self._executor = ThreadPoolExecutor(max_workers=1)
+        self._module_buttons = []
+        self._busy = False
+        self._closing = False
+        
         # Serial port variables
         self.port_var = tk.StringVar()
         self.baudrate_var = tk.IntVar(value=9600)
@@ -591,7 +2024,7 @@ class E32ConfigGUI:
         self.baud_combo.grid(row=1, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
         
         # Connect/Disconnect button
-        self.connect_button = ttk.Button(conn_frame, text="Connect", command=self._toggle_connection)
+        self.connect_button = self._module_button(conn_frame, text="Connect", command=self._toggle_connection)
         self.connect_button.grid(row=2, column=0, columnspan=3, padx=5, pady=20)
         
         # Version and info
@@ -776,10 +2209,10 @@ If you've already set M0=HIGH and M1=HIGH manually, check the option below.
         button_frame.grid(row=7, column=0, columnspan=4, pady=20)
         
         # Read/Write buttons
-        ttk.Button(button_frame, text="Read from Module", command=self._read_params).pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Write to Module", command=self._write_params).pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Reset Module", command=self._reset_module).pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Factory Reset", command=self._factory_reset).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Read from Module", command=self._read_params).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Write to Module", command=self._write_params).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Reset Module", command=self._reset_module).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Factory Reset", command=self._factory_reset).pack(side=tk.LEFT, padx=10)
     
     def _setup_advanced_tab(self):
         """Setup the advanced settings tab"""
@@ -890,8 +2323,8 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
         button_frame.grid(row=5, column=0, columnspan=4, pady=20)
         
         # Read/Write buttons (same functionality as basic tab)
-        ttk.Button(button_frame, text="Read from Module", command=self._read_params).pack(side=tk.LEFT, padx=10)
-        ttk.Button(button_frame, text="Write to Module", command=self._write_params).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Read from Module", command=self._read_params).pack(side=tk.LEFT, padx=10)
+        self._module_button(button_frame, text="Write to Module", command=self._write_params).pack(side=tk.LEFT, padx=10)
     
     def _setup_monitor_tab(self):
         """Setup the monitor tab for seeing module status and testing"""
@@ -903,7 +2336,7 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
         ttk.Label(monitor_frame, text="Module Information:").grid(row=0, column=0, sticky=tk.W, padx=5, pady=5)
         self.version_var = tk.StringVar(value="Not available")
         ttk.Label(monitor_frame, textvariable=self.version_var).grid(row=0, column=1, sticky=tk.W, padx=5, pady=5)
-        ttk.Button(monitor_frame, text="Get Version", command=self._get_version).grid(row=0, column=2, padx=5, pady=5)
+        self._module_button(monitor_frame, text="Get Version", command=self._get_version).grid(row=0, column=2, padx=5, pady=5)
         
         # Current parameters display
         param_frame = ttk.LabelFrame(monitor_frame, text="Current Parameters")
@@ -913,7 +2346,7 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
         self.param_text.pack(fill=tk.BOTH, expand=True, padx=5, pady=5)
         
         # Add a button to refresh parameters
-        ttk.Button(param_frame, text="Refresh Parameters", command=self._refresh_params_display).pack(pady=5)
+        self._module_button(param_frame, text="Refresh Parameters", command=self._refresh_params_display).pack(pady=5)
         
         # Test transmission frame
         test_frame = ttk.LabelFrame(monitor_frame, text="Test Transmission")
@@ -925,20 +2358,67 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
         ttk.Entry(test_frame, textvariable=self.test_data_var, width=40).grid(row=0, column=1, sticky=tk.W+tk.E, padx=5, pady=5)
         
         # Send button
-        ttk.Button(test_frame, text="Send Data", command=self._send_test_data).grid(row=0, column=2, padx=5, pady=5)
+        self._module_button(test_frame, text="Send Data", command=self._send_test_data).grid(row=0, column=2, padx=5, pady=5)
         
         # Received data
         ttk.Label(test_frame, text="Received Data:").grid(row=1, column=0, sticky=tk.W, padx=5, pady=5)
         self.received_text = scrolledtext.ScrolledText(test_frame, height=5, width=60)
         self.received_text.grid(row=2, column=0, columnspan=3, sticky=tk.W+tk.E, padx=5, pady=5)
         
-        # Clear button
-        ttk.Button(test_frame, text="Clear Received", command=lambda: self.received_text.delete(1.0, tk.END)).grid(row=3, column=0, columnspan=3, pady=5)
+        # Clear, save and capture buttons
+        history_frame = ttk.Frame(test_frame)
+        history_frame.grid(row=3, column=0, columnspan=3, pady=5)
+        ttk.Button(history_frame, text="Clear Received", command=self._clear_received).pack(side=tk.LEFT, padx=5)
+        ttk.Button(history_frame, text="Save History...", command=self._save_received_history).pack(side=tk.LEFT, padx=5)
+        self.capture_button = ttk.Button(history_frame, text="Capture to File...", command=self._toggle_capture)
+        self.capture_button.pack(side=tk.LEFT, padx=5)
         
         # Start/stop receiving
         self.receiving_var = tk.BooleanVar(value=False)
         self.receive_button = ttk.Button(test_frame, text="Start Receiving", command=self._toggle_receiving)
         self.receive_button.grid(row=4, column=0, columnspan=3, pady=5)
+        
+        # How many received chunks were merged into the last display update
+        self.receive_stats_var = tk.StringVar(value="")
+        ttk.Label(test_frame, textvariable=self.receive_stats_var).grid(row=5, column=0, columnspan=3, pady=2)
+    
+    def _module_button(self, parent, **kwargs):
+        """Create a button that talks to the module and is disabled while an operation runs"""
+        button = ttk.Button(parent, **kwargs)
+        self._module_buttons.append(button)
+        return button
+    
+    def _set_busy(self, busy):
+        """Enable or disable the module buttons"""
+        self._busy = busy
+        for button in self._module_buttons:
+            button.state(["disabled"] if busy else ["!disabled"])
+    
+    def _run_in_background(self, task, on_done, busy_message):
+        """Run task() on the serial worker thread and call on_done(result) on the Tk thread
+        The module buttons stay disabled until the task has finished."""
+        if self._busy:
+            return
+            
+        self.status_var.set(busy_message)
+        self._set_busy(True)
+        
+        future = self._executor.submit(task)
+        future.add_done_callback(lambda f: self.master.after(0, self._finish_background, f, on_done))
+    
+    def _finish_background(self, future, on_done):
+        """Completion of a background task, on the Tk thread"""
+        self._set_busy(False)
+        
+        try:
+            result = future.result()
+        except Exception as e:
+            logger.error(f"Module operation failed: {e}")
+            self.status_var.set(f"Error: {e}")
+            messagebox.showerror("Error", f"Module operation failed: {e}")
+            return
+            
+        on_done(result)
     
     def _refresh_ports(self):
         """Refresh the list of available serial ports"""
@@ -954,16 +2434,8 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
     def _toggle_connection(self):
         """Connect to or disconnect from the module"""
         if self.module and self.module.serial and self.module.serial.is_open:
-            # Disconnect
-            self.module.disconnect()
-            self.module = None
-            self.connect_button.config(text="Connect")
-            self.status_var.set("Disconnected from module")
-            
-            # Disable tabs
-            self.notebook.tab(1, state="disabled")
-            self.notebook.tab(2, state="disabled")
-            self.notebook.tab(3, state="disabled")
+            # Disconnect (waits for the port, so not on the Tk thread)
+            self._run_in_background(self.module.disconnect, self._on_disconnected, "Disconnecting from module...")
         else:
             # Connect
             port = self.port_var.get()
@@ -1021,17 +2493,27 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
                 messagebox.showerror("Error", f"Failed to connect to module on {port}")
                 self.module = None
     
+    def _on_disconnected(self, result):
+        """Update the UI after disconnecting (Tk thread)"""
+        self.module = None
+        self.connect_button.config(text="Connect")
+        self.status_var.set("Disconnected from module")
+        
+        # Disable tabs
+        self.notebook.tab(1, state="disabled")
+        self.notebook.tab(2, state="disabled")
+        self.notebook.tab(3, state="disabled")
+    
     def _read_params(self):
         """Read parameters from the module"""
         if not self.module:
             messagebox.showerror("Error", "Not connected to module")
             return
             
-        self.status_var.set("Reading parameters from module...")
-        self.master.update()
-        
-        params = self.module.get_parameters()
-        
+        self._run_in_background(self.module.get_parameters, self._on_params_read, "Reading parameters from module...")
+    
+    def _on_params_read(self, params):
+        """Show parameters read from the module (Tk thread)"""
         if params:
             # Update UI with retrieved parameters
             self.address_var.set(params.get("address", 0))
@@ -1045,8 +2527,8 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             self.wake_time_var.set(params.get("wake_up_time", 0))
             self.fec_var.set(params.get("fec", 1))
             
-            self.status_var.set("Parameters read successfully")
-            self._refresh_params_display()
+            # Render the monitor tab from the same snapshot instead of reading again
+            self._show_params(params)
         else:
             self.status_var.set("Failed to read parameters")
             messagebox.showerror("Error", "Failed to read parameters from module")
@@ -1116,25 +2598,24 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             ):
                 return
                 
-        self.status_var.set("Writing parameters to module...")
-        self.master.update()
-        
-        if self.module.set_parameters(params):
-            self.status_var.set("Parameters written successfully")
-            
-            # If baudrate changed, notify the user to reconnect
-            if params["uart_baud"] != 3:  # Default baud rate index (9600 bps)
-                messagebox.showinfo(
-                    "Baud Rate Changed",
-                    f"The module's baud rate has been changed to {baud_options[params['uart_baud']]} bps.\n\n"
-                    "Please disconnect and reconnect at the new baud rate."
-                )
+        def on_done(success):
+            if success:
+                # Update the parameter display from what was just written (no re-read)
+                self._show_params(self.module.cached_parameters() or params)
+                self.status_var.set("Parameters written successfully")
                 
-            # Update the parameter display
-            self._refresh_params_display()
-        else:
-            self.status_var.set("Failed to write parameters")
-            messagebox.showerror("Error", "Failed to write parameters to module")
+                # If baudrate changed, notify the user to reconnect
+                if params["uart_baud"] != 3:  # Default baud rate index (9600 bps)
+                    messagebox.showinfo(
+                        "Baud Rate Changed",
+                        f"The module's baud rate has been changed to {baud_options[params['uart_baud']]} bps.\n\n"
+                        "Please disconnect and reconnect at the new baud rate."
+                    )
+            else:
+                self.status_var.set("Failed to write parameters")
+                messagebox.showerror("Error", "Failed to write parameters to module")
+                
+        self._run_in_background(lambda: self.module.set_parameters(params), on_done, "Writing parameters to module...")
     
     def _reset_module(self):
         """Reset the module"""
@@ -1143,17 +2624,17 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             return
             
         if messagebox.askyesno("Confirm Reset", "Are you sure you want to reset the module?"):
-            self.status_var.set("Resetting module...")
-            self.master.update()
-            
-            if self.module.reset_module():
-                self.status_var.set("Module reset successfully")
-                
-                # Re-read parameters after reset
-                self._read_params()
-            else:
-                self.status_var.set("Failed to reset module")
-                messagebox.showerror("Error", "Failed to reset module")
+            def on_done(success):
+                if success:
+                    self.status_var.set("Module reset successfully")
+                    
+                    # Re-read parameters after reset
+                    self._read_params()
+                else:
+                    self.status_var.set("Failed to reset module")
+                    messagebox.showerror("Error", "Failed to reset module")
+                    
+            self._run_in_background(self.module.reset_module, on_done, "Resetting module...")
     
     def _factory_reset(self):
         """Reset the module to factory defaults"""
@@ -1166,17 +2647,17 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             "Are you sure you want to reset the module to factory defaults?\n\n"
             "This will erase all custom settings."
         ):
-            self.status_var.set("Performing factory reset...")
-            self.master.update()
-            
-            if self.module.factory_reset():
-                self.status_var.set("Factory reset successful")
-                
-                # Re-read parameters after factory reset
-                self._read_params()
-            else:
-                self.status_var.set("Failed to perform factory reset")
-                messagebox.showerror("Error", "Failed to perform factory reset")
+            def on_done(success):
+                if success:
+                    self.status_var.set("Factory reset successful")
+                    
+                    # Re-read parameters after factory reset
+                    self._read_params()
+                else:
+                    self.status_var.set("Failed to perform factory reset")
+                    messagebox.showerror("Error", "Failed to perform factory reset")
+                    
+            self._run_in_background(self.module.factory_reset, on_done, "Performing factory reset...")
     
     def _get_version(self):
         """Get module version information"""
@@ -1184,33 +2665,38 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             messagebox.showerror("Error", "Not connected to module")
             return
             
-        self.status_var.set("Getting module version...")
-        self.master.update()
-        
-        version_info = self.module.version()
-        
-        if version_info:
-            version_str = f"Model: E32-{version_info['model']}, Version: {version_info['version']}, Features: {version_info['features']}"
-            self.version_var.set(version_str)
-            self.status_var.set("Version read successfully")
-        else:
-            self.status_var.set("Failed to read version")
-            messagebox.showerror("Error", "Failed to read module version")
+        def on_done(version_info):
+            if version_info:
+                version_str = f"Model: E32-{version_info['model']}, Version: {version_info['version']}, Features: {version_info['features']}"
+                self.version_var.set(version_str)
+                self.status_var.set("Version read successfully")
+            else:
+                self.status_var.set("Failed to read version")
+                messagebox.showerror("Error", "Failed to read module version")
+                
+        self._run_in_background(self.module.version, on_done, "Getting module version...")
     
     def _refresh_params_display(self):
-        """Refresh the parameters display in the monitor tab"""
+        """Refresh the parameters display in the monitor tab by reading the module
+        Only used when the user asks for it; other paths render the last known
+        snapshot with _show_params."""
         if not self.module:
             self.param_text.delete(1.0, tk.END)
             self.param_text.insert(tk.END, "Not connected to module")
             return
             
-        params = self.module.get_parameters()
-        
+        self._run_in_background(self.module.get_parameters, self._show_params, "Reading parameters from module...")
+    
+    def _show_params(self, params):
+        """Render parameters in the monitor tab (Tk thread)"""
         if not params:
             self.param_text.delete(1.0, tk.END)
             self.param_text.insert(tk.END, "Failed to read parameters")
+            self.status_var.set("Failed to read parameters")
             return
             
+        self.status_var.set("Parameters read successfully")
+        
         # Format display text
         self.param_text.delete(1.0, tk.END)
         
@@ -1268,18 +2754,26 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
         if not data:
             return
             
-        try:
-            # Switch to normal mode for transmission
-            if self.module.set_mode(ModuleMode.NORMAL):
-                # Send the data
-                self.module.serial.write(data.encode('utf-8'))
-                self.status_var.set(f"Data sent: {data}")
-            else:
-                self.status_var.set("Failed to set module to normal mode")
-                messagebox.showerror("Error", "Failed to set module to normal mode for transmission")
-        except Exception as e:
-            self.status_var.set(f"Error sending data: {str(e)}")
-            messagebox.showerror("Error", f"Failed to send data: {str(e)}")
+        module = self.module
+        
+        def send():
+            # Switch to normal mode for transmission (may wait for AUX)
+            if not module.set_mode(ModuleMode.NORMAL):
+                return None
+            # Queue the data; it is written as fast as the module's transmit buffer allows
+            return module.queue_data(data.encode('utf-8'), timeout=1)
+            
+        self._run_in_background(send, lambda queued: self._on_test_data_sent(queued, data), "Sending data...")
+    
+    def _on_test_data_sent(self, queued, data):
+        """Report the result of _send_test_data (Tk thread)"""
+        if queued is None:
+            self.status_var.set("Failed to set module to normal mode")
+            messagebox.showerror("Error", "Failed to set module to normal mode for transmission")
+        elif not queued:
+            self.status_var.set("Transmit queue is full")
+        else:
+            self.status_var.set(f"Data sent: {data}")
     
     def _toggle_receiving(self):
         """Toggle receiving mode"""
@@ -1288,8 +2782,9 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             return
             
         if self.receiving_var.get():
-            # Stop receiving
+            # Stop receiving (and wake the receive thread if it is waiting for data)
             self.receiving_var.set(False)
+            self.module.cancel_read()
             self.receive_button.config(text="Start Receiving")
             self.status_var.set("Stopped receiving")
         else:
@@ -1298,8 +2793,9 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             self.receive_button.config(text="Stop Receiving")
             self.status_var.set("Started receiving")
             
-            # Start receive thread
+            # Start receive thread and the display update tick
             threading.Thread(target=self._receive_data, daemon=True).start()
+            self._schedule_receive_drain()
     
     def _receive_data(self):
         """Receive data in a separate thread"""
@@ -1311,35 +2807,123 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             self.receive_button.config(text="Start Receiving")
             return
             
-        self.module.serial.reset_input_buffer()
+        self.module.discard_input()
         
         while self.receiving_var.get():
             try:
-                if self.module.serial.in_waiting:
-                    data = self.module.serial.read(self.module.serial.in_waiting)
-                    if data:
-                        # Try to decode as UTF-8, fall back to hex if not possible
+                # Blocks until data arrives (or briefly times out to check for stop),
+                # so packets show up immediately and the idle loop uses no CPU
+                data = self.module.read_data(timeout=0.5, copy=False)
+                if data:
+                    # Keep the raw bytes: bounded history, which the Tk thread shows on
+                    # its next frame tick, and the capture file if one is open. Both copy
+                    # the view, so it is dropped before the next read.
+                    self.receive_history.append(data)
+                    capture_file = self._capture_file
+                    if capture_file:
                         try:
-                            decoded = data.decode('utf-8')
-                        except UnicodeDecodeError:
-                            decoded = f"HEX: {data.hex()}"
-                            
-                        # Add timestamp
-                        timestamp = time.strftime("%H:%M:%S")
-                        
-                        # Update the text widget in thread-safe way
-                        self.master.after(0, self._update_received_text, f"[{timestamp}] {decoded}\n")
+                            capture_file.write(data)
+                        except ValueError:
+                            pass  # Capture was stopped (file closed) meanwhile
+                    data = None
             except Exception as e:
                 self.master.after(0, self._update_status, f"Error receiving data: {str(e)}")
                 break
-                
-            time.sleep(0.1)
+    
+    def _schedule_receive_drain(self):
+        """Schedule the next flush of received data into the Monitor tab"""
+        if not self._receive_drain_scheduled:
+            self._receive_drain_scheduled = True
+            self.master.after(self.RECEIVE_FRAME_MS, self._drain_received)
+    
+    def _drain_received(self):
+        """Show the data received since the last tick in one update (Tk thread)"""
+        self._receive_drain_scheduled = False
+        
+        chunks = self.receive_history.chunks
+        data, self._receive_position = self.receive_history.read_from(self._receive_position)
+        
+        if data:
+            # Try to decode as UTF-8, fall back to hex if not possible
+            try:
+                decoded = data.decode('utf-8')
+            except UnicodeDecodeError:
+                decoded = f"HEX: {data.hex()}"
+            timestamp = time.strftime("%H:%M:%S")
+            self._update_received_text(f"[{timestamp}] {decoded}\n")
+            self.receive_stats_var.set(f"Last update merged {max(1, chunks - self._receive_chunks)} chunk(s)")
+        self._receive_chunks = chunks
+            
+        # Keep ticking while receiving, and once more afterwards to flush late chunks
+        if self.receiving_var.get() or data:
+            self._schedule_receive_drain()
     
     def _update_received_text(self, text):
         """Update received text in a thread-safe way"""
         self.received_text.insert(tk.END, text)
+        
+        # Keep the widget bounded: trim the oldest lines in one go once the
+        # view is RECEIVE_TRIM_LINES over the limit, so inserts stay cheap
+        lines = int(self.received_text.index('end-1c').split('.')[0])
+        if lines > self.RECEIVE_MAX_LINES + self.RECEIVE_TRIM_LINES:
+            self.received_text.delete('1.0', f'{lines - self.RECEIVE_MAX_LINES + 1}.0')
+            
         self.received_text.see(tk.END)
     
+    def _clear_received(self):
+        """Clear the received data view and history"""
+        self.received_text.delete(1.0, tk.END)
+        self.receive_history.clear()
+        self._receive_position = 0
+        self._receive_chunks = 0
+    
+    def _save_received_history(self):
+        """Save the retained received data (raw bytes) to a file"""
+        filename = filedialog.asksaveasfilename(
+            title="Save Received Data",
+            defaultextension=".bin",
+            filetypes=[("Binary files", "*.bin"), ("All files", "*.*")]
+        )
+        
+        if not filename:
+            return
+            
+        try:
+            with open(filename, 'wb') as f:
+                f.write(self.receive_history.getvalue())
+            message = f"Received data saved to {os.path.basename(filename)}"
+            if self.receive_history.dropped_bytes:
+                message += f" ({self.receive_history.dropped_bytes} oldest bytes were not kept)"
+            self.status_var.set(message)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to save received data: {e}")
+    
+    def _toggle_capture(self):
+        """Start or stop appending all received data to a capture file"""
+        if self._capture_file:
+            capture_file, self._capture_file = self._capture_file, None
+            capture_file.close()
+            self.capture_button.config(text="Capture to File...")
+            self.status_var.set("Stopped capturing received data")
+            return
+            
+        filename = filedialog.asksaveasfilename(
+            title="Capture Received Data",
+            defaultextension=".bin",
+            filetypes=[("Binary files", "*.bin"), ("All files", "*.*")]
+        )
+        
+        if not filename:
+            return
+            
+        try:
+            # Unbuffered, so the file is complete even if the application is killed
+            self._capture_file = open(filename, 'ab', buffering=0)
+            self.capture_button.config(text="Stop Capture")
+            self.status_var.set(f"Capturing received data to {os.path.basename(filename)}")
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to open capture file: {e}")
+    
     def _update_status(self, text):
         """Update status bar in a thread-safe way"""
         self.status_var.set(text)
@@ -1446,38 +3030,75 @@ Note: These modes cannot be changed from this software unless you use GPIO contr
             messagebox.showerror("Error", f"Failed to save configuration: {e}")
     
     def _on_close(self):
-        """Clean up when window is closed"""
-        if self.module:
-            self.module.disconnect()
-        self.master.destroy()
+        """Clean up when window is closed
+        The window is hidden at once, but only destroyed once the serial worker has
+        finished any operation still running and disconnected the module, so the
+        Tk thread never waits for the port."""
+        if self._closing:
+            return
+        self._closing = True
+        self.master.withdraw()
+        
+        self.receiving_var.set(False)
+        if self._capture_file:
+            self._capture_file.close()
+            self._capture_file = None
+            
+        module = self.module
+        if module:
+            module.cancel_read()
+        future = self._executor.submit(module.disconnect if module else lambda: None)
+        future.add_done_callback(lambda f: self.master.after(0, self.master.destroy))
+        self._executor.shutdown(wait=False)
 
 
 class E32CLI:
     """
     Command-line interface for configuring the E32 module
     """
+    # The receive command writes its JSON lines in batches of this many packets,
+    # or sooner when the link goes quiet or this many seconds have passed
+    RECEIVE_FLUSH_PACKETS = 64
+    RECEIVE_FLUSH_SECONDS = 0.1
+    
+    # Commands that a running daemon (see e32_daemon.py) can serve
+    DAEMON_COMMANDS = ('read', 'write', 'reset', 'factory-reset', 'version', 'save-config',
+                       'load-config', 'send-data', 'receive', 'monitor')
+    
     def __init__(self, args):
         self.args = args
         self.module = None
         
     def run(self):
         """Run the CLI based on arguments"""
-        # Connect to the module
-        self.module = E32Module(
-            port=self.args.port,
-            baudrate=self.args.baudrate,
-            timeout=1,
-            m0_pin=self.args.m0_pin,
-            m1_pin=self.args.m1_pin,
-            aux_pin=self.args.aux_pin,
-            use_gpio=self.args.use_gpio
-        )
+        # Fleet commands open their own ports
+        if self.args.command == 'fleet':
+            return self._run_fleet()
+        if self.args.command == 'daemon':
+            return self._run_daemon()
+            
+        # Connect to the module, through the daemon if one is running
+        self.module = self._daemon_client()
+        if self.module is None:
+            self.module = E32Module(
+                port=self.args.port,
+                baudrate=self.args.baudrate,
+                timeout=1,
+                m0_pin=self.args.m0_pin,
+                m1_pin=self.args.m1_pin,
+                aux_pin=self.args.aux_pin,
+                use_gpio=self.args.use_gpio,
+                gpio_backend=self.args.gpio_backend,
+                gpio_chip=self.args.gpio_chip
+            )
         
         if not self.module.connect():
             logger.error(f"Failed to connect to module on {self.args.port}")
             return 1
             
         logger.info(f"Connected to module on {self.args.port} at {self.args.baudrate} baud")
+        if not isinstance(self.module, E32Module):
+            self._check_daemon_gpio()
         
         try:
             # Handle command
@@ -1499,13 +3120,73 @@ class E32CLI:
                 self._scan_ports()
             elif self.args.command == 'send-data':
                 self._send_data()
+            elif self.args.command in ('receive', 'monitor'):
+                self._receive()
             else:
                 logger.error(f"Unknown command: {self.args.command}")
                 return 1
                 
             return 0
         finally:
+            if self.args.stats:
+                # receive and monitor keep stdout for their JSON Lines stream
+                out = sys.stderr if self.args.command in ('receive', 'monitor') else sys.stdout
+                self._print_stats(self.module.get_stats(), out)
             self.module.disconnect()
+    
+    def _daemon_client(self):
+        """Return a client for a running daemon that can serve this command, or None"""
+        if self.args.no_daemon or self.args.command not in self.DAEMON_COMMANDS:
+            return None
+        try:
+            from e32_daemon import DaemonClient
+        except ImportError:
+            return None
+        client = DaemonClient(self.args.socket, port=self.args.port, baudrate=self.args.baudrate)
+        if not client.available():
+            return None
+        return client
+    
+    def _check_daemon_gpio(self):
+        """Warn if the daemon serving this command uses other GPIO options than given
+        The daemon drives the pins with the options it was started with."""
+        requested = (self.args.use_gpio, self.args.m0_pin, self.args.m1_pin, self.args.aux_pin)
+        served = (self.module.use_gpio, self.module.m0_pin, self.module.m1_pin, self.module.aux_pin)
+        if any(requested) and requested != served:
+            logger.warning(f"The daemon controls {self.args.port} with use_gpio={served[0]}, "
+                           f"M0={served[1]}, M1={served[2]}, AUX={served[3]}; the GPIO options given here "
+                           f"are ignored (use --no-daemon to apply them)")
+    
+    def _run_daemon(self):
+        """Keep modules connected and serve them over a Unix domain socket"""
+        from e32_daemon import E32Daemon
+        daemon = E32Daemon(
+            self.args.socket,
+            m0_pin=self.args.m0_pin,
+            m1_pin=self.args.m1_pin,
+            aux_pin=self.args.aux_pin,
+            use_gpio=self.args.use_gpio,
+            gpio_backend=self.args.gpio_backend,
+            gpio_chip=self.args.gpio_chip
+        )
+        return 0 if daemon.serve_forever() else 1
+    
+    def _print_stats(self, stats, out=None):
+        """Print the per-command statistics of one module to out (default stdout)"""
+        out = out or sys.stdout
+        def latency(histogram):
+            if not histogram["count"]:
+                return "-"
+            return f"{histogram['p50_ms']}/{histogram['p95_ms']}/{histogram['p99_ms']}"
+        
+        print(f"\nCommand statistics for {stats['port']}:", file=out)
+        print(f"{'Command':<8} {'Calls':>6} {'Timeouts':>9} {'Retries':>8} {'Sent':>6} {'Recv':>6}  "
+              f"{'First byte p50/p95/p99 ms':<26} {'Last byte p50/p95/p99 ms':<26}", file=out)
+        for name, command in stats["commands"].items():
+            print(f"{name:<8} {command['calls']:>6} {command['timeouts']:>9} {command['retries']:>8} "
+                  f"{command['bytes_sent']:>6} {command['bytes_received']:>6}  "
+                  f"{latency(command['time_to_first_byte']):<26} {latency(command['time_to_last_byte']):<26}",
+                  file=out)
             
     def _read_params(self):
         """Read and display module parameters"""
@@ -1569,8 +3250,9 @@ class E32CLI:
             
         return 0
     
-    def _write_params(self):
-        """Write parameters to module"""
+    def _collect_params(self):
+        """Collect the parameters to write from --input or the individual parameter options
+        Returns None if the input file cannot be loaded."""
         # Load parameters from file if specified
         if self.args.input:
             try:
@@ -1579,7 +3261,7 @@ class E32CLI:
                 logger.info(f"Parameters loaded from {self.args.input}")
             except Exception as e:
                 logger.error(f"Failed to load parameters from file: {e}")
-                return 1
+                return None
         else:
             # Collect parameters from command line
             params = {}
@@ -1619,6 +3301,14 @@ class E32CLI:
             address = params["address"]
             params["addh"] = (address >> 8) & 0xFF
             params["addl"] = address & 0xFF
+            
+        return params
+    
+    def _write_params(self):
+        """Write parameters to module"""
+        params = self._collect_params()
+        if params is None:
+            return 1
         
         # Check if we have parameters to write
         if not params:
@@ -1627,8 +3317,13 @@ class E32CLI:
             
         logger.info("Writing parameters to module...")
         
-        if self.module.set_parameters(params):
-            logger.info("Parameters written successfully")
+        if self.module.set_parameters(params, skip_unchanged=self.args.skip_unchanged, persist=not self.args.volatile):
+            if self.module.last_write_skipped:
+                logger.info("Parameters unchanged, nothing written")
+            elif self.args.volatile:
+                logger.info("Parameters applied (not saved, lost on reset)")
+            else:
+                logger.info("Parameters written successfully")
             return 0
         else:
             logger.error("Failed to write parameters to module")
@@ -1705,8 +3400,13 @@ class E32CLI:
                 
             logger.info(f"Configuration loaded from {self.args.input}")
             
-            if self.module.set_parameters(params):
-                logger.info("Parameters applied successfully")
+            if self.module.set_parameters(params, skip_unchanged=self.args.skip_unchanged, persist=not self.args.volatile):
+                if self.module.last_write_skipped:
+                    logger.info("Parameters unchanged, nothing written")
+                elif self.args.volatile:
+                    logger.info("Parameters applied (not saved, lost on reset)")
+                else:
+                    logger.info("Parameters applied successfully")
                 return 0
             else:
                 logger.error("Failed to apply parameters to module")
@@ -1729,26 +3429,310 @@ class E32CLI:
         return 0
     
     def _send_data(self):
-        """Send data through the module"""
-        if not self.args.data:
-            logger.error("No data specified to send")
-            return 1
+        """Send data through the module
+        The data comes from --data, --file or standard input (--stdin) and goes through
+        the module's transmit queue, which releases sub-packet sized chunks only as fast
+        as the module can take them (by the AUX pin, or a model of the air data rate)."""
+        if self.args.stdin:
+            source = sys.stdin.buffer
+            logger.info("Sending data from standard input")
+        elif self.args.file:
+            try:
+                source = open(self.args.file, 'rb')
+            except OSError as e:
+                logger.error(f"Failed to open {self.args.file}: {e}")
+                return 1
+            logger.info(f"Sending data from {self.args.file}")
+        else:
+            source = io.BytesIO(self.args.data.encode('utf-8'))
+            logger.info(f"Sending data: {self.args.data}")
             
-        logger.info(f"Sending data: {self.args.data}")
-        
-        # Switch to normal mode for transmission
+        try:
+            air_data_rate = self._transmit_air_rate()
+            
+            # Switch to normal mode for transmission
+            if not self.module.set_mode(ModuleMode.NORMAL):
+                logger.error("Failed to set module to normal mode")
+                return 1
+                
+            start = time.monotonic()
+            sent = self.module.send_stream(source, air_data_rate=air_data_rate)
+            elapsed = time.monotonic() - start
+            rate = f", {sent * 8 / elapsed:.0f} bps" if elapsed > 0 and sent else ""
+            logger.info(f"Data sent successfully: {sent} bytes in {elapsed:.2f}s{rate}")
+            return 0
+        except KeyboardInterrupt:
+            logger.info("Interrupted")
+            return 1
+        except Exception as e:
+            logger.error(f"Failed to send data: {e}")
+            return 1
+        finally:
+            if source is not sys.stdin.buffer:
+                source.close()
+    
+    def _transmit_air_rate(self):
+        """Air data rate in bits per second used to pace send-data
+        Taken from --air-rate, or read from the module when the mode pins are under
+        our control. Otherwise the factory default (2.4k) is assumed."""
+        if self.module._has_aux():
+            return None  # Paced by the AUX pin
+        index = self.args.air_rate
+        if index is None and self.module.use_gpio and self.module.m0_pin and self.module.m1_pin:
+            params = self.module.get_parameters()
+            if params:
+                index = params["air_data_rate"]
+        if index is None:
+            logger.info("Air data rate unknown, pacing for 2.4k (use --air-rate to set it)")
+            index = 2
+        return AIR_DATA_RATES[index & 0x07]
+    
+    def _receive(self):
+        """Stream packets received over the air to stdout as JSON Lines
+        Bytes that arrive without a pause longer than --gap form one packet (up to
+        --max-packet bytes). Output is flushed in batches, and whenever the link goes
+        quiet, so a slow link is still shown without delay. Stops after --count
+        packets, after --duration seconds or on Ctrl-C."""
+        # Switch to normal mode for reception
         if not self.module.set_mode(ModuleMode.NORMAL):
             logger.error("Failed to set module to normal mode")
             return 1
             
+        gap = self.args.gap / 1000.0
+        max_packet = max(1, self.args.max_packet)
+        start = time.monotonic()
+        deadline = start + self.args.duration if self.args.duration else None
+        
+        lines = []
+        packets = 0
+        received_bytes = 0
+        last_flush = start
+        
+        logger.info("Receiving, press Ctrl-C to stop")
         try:
-            self.module.serial.write(self.args.data.encode('utf-8'))
-            logger.info("Data sent successfully")
-            return 0
+            while not self.args.count or packets < self.args.count:
+                wait = 0.5
+                if deadline is not None:
+                    wait = min(wait, deadline - time.monotonic())
+                    if wait <= 0:
+                        break
+                        
+                data = self.module.read_data(timeout=wait, max_bytes=max_packet, copy=False)
+                if data:
+                    received_at = time.monotonic()
+                    packet = bytearray(data)
+                    data = None  # Dropping the views lets the receive buffer reuse their space
+                    
+                    # Collect the rest of the packet until the line goes quiet
+                    while len(packet) < max_packet:
+                        more = self.module.read_data(timeout=gap, max_bytes=max_packet - len(packet), copy=False)
+                        if not more:
+                            break
+                        packet.extend(more)
+                        more = None
+                        
+                    packets += 1
+                    received_bytes += len(packet)
+                    lines.append(json.dumps(self._packet_record(packets, start, received_at, packet)))
+                    
+                now = time.monotonic()
+                if lines and (not data or len(lines) >= self.RECEIVE_FLUSH_PACKETS
+                              or now - last_flush >= self.RECEIVE_FLUSH_SECONDS):
+                    self._write_lines(lines)
+                    lines = []
+                    last_flush = now
+        except KeyboardInterrupt:
+            logger.info("Interrupted")
+        except BrokenPipeError:
+            # The reader of our output went away (e.g. piped into head)
+            lines = []
+            self._silence_stdout()
+            
+        try:
+            if lines:
+                self._write_lines(lines)
+        except BrokenPipeError:
+            self._silence_stdout()
+            
+        logger.info(f"Received {packets} packet(s), {received_bytes} bytes in {time.monotonic() - start:.1f}s")
+        return 0
+    
+    @staticmethod
+    def _packet_record(seq, start, received_at, packet):
+        """Build the JSON Lines record of one received packet
+        text is the packet decoded as UTF-8, or null if it is not valid UTF-8."""
+        try:
+            text = packet.decode('utf-8')
+        except UnicodeDecodeError:
+            text = None
+        return {
+            "seq": seq,
+            "monotonic": round(received_at, 6),
+            "elapsed": round(received_at - start, 6),
+            "length": len(packet),
+            "hex": packet.hex(),
+            "text": text,
+        }
+    
+    @staticmethod
+    def _write_lines(lines):
+        """Write a batch of JSON lines to stdout with a single write and flush"""
+        sys.stdout.write("\n".join(lines) + "\n")
+        sys.stdout.flush()
+    
+    @staticmethod
+    def _silence_stdout():
+        """Point stdout at os.devnull so that exiting does not fail on a closed pipe"""
+        devnull = os.open(os.devnull, os.O_WRONLY)
+        os.dup2(devnull, sys.stdout.fileno())
+        os.close(devnull)
+    
+    def _fleet_targets(self):
+        """Build the list of (port, baudrate) pairs from --ports and --manifest
+        Port arguments may be glob patterns such as /dev/ttyUSB*. A manifest is a JSON
+        list whose entries are port names or objects with "port" and "baudrate"."""
+        targets = []
+        
+        for pattern in self.args.ports or []:
+            if any(char in pattern for char in '*?['):
+                matches = sorted(glob.glob(pattern))
+                if not matches:
+                    logger.warning(f"No ports match {pattern}")
+                targets.extend((port, self.args.baudrate) for port in matches)
+            else:
+                targets.append((pattern, self.args.baudrate))
+        
+        if self.args.manifest:
+            with open(self.args.manifest, 'r') as f:
+                manifest = json.load(f)
+            for entry in manifest:
+                if isinstance(entry, dict):
+                    targets.append((entry["port"], entry.get("baudrate", self.args.baudrate)))
+                else:
+                    targets.append((entry, self.args.baudrate))
+        
+        # Drop duplicate ports but keep the order
+        unique = {}
+        for port, baudrate in targets:
+            unique.setdefault(port, baudrate)
+        return list(unique.items())
+    
+    def _fleet_worker(self, port, baudrate, params):
+        """Run the fleet action on one port and return its report entry"""
+        result = {"port": port, "baudrate": baudrate, "ok": False}
+        start = time.monotonic()
+        
+        module = E32Module(port=port, baudrate=baudrate, timeout=1)
+        try:
+            if not module.connect():
+                result["error"] = "Failed to connect"
+                return result
+            result["connect_ms"] = round((time.monotonic() - start) * 1000, 1)
+            
+            with module.config_session() as ready:
+                if not ready:
+                    result["error"] = "Module not in configuration mode"
+                    return result
+                    
+                action = self.args.action
+                if action == 'read':
+                    current = module.get_parameters()
+                    result["ok"] = current is not None
+                    result["parameters"] = current
+                elif action == 'write':
+                    result["ok"] = module.set_parameters(
+                        params, skip_unchanged=self.args.skip_unchanged, persist=not self.args.volatile
+                    )
+                    result["written"] = result["ok"] and not module.last_write_skipped
+                elif action == 'verify':
+                    current = module.get_parameters()
+                    if current is not None:
+                        registers = bytes([current[key] for key in ("addh", "addl", "sped", "chan", "option")])
+                        expected = E32Module._encode_registers(params, registers)
+                        result["ok"] = True
+                        result["match"] = expected == registers
+                        result["mismatched"] = [
+                            key for key in params if key in current and current[key] != params[key]
+                        ]
+                elif action == 'version':
+                    info = module.version()
+                    result["ok"] = info is not None
+                    result["version"] = info
+                    
+                if not result["ok"] and "error" not in result:
+                    result["error"] = f"{action} failed"
         except Exception as e:
-            logger.error(f"Failed to send data: {e}")
+            result["error"] = str(e)
+        finally:
+            module.disconnect()
+            result["elapsed_ms"] = round((time.monotonic() - start) * 1000, 1)
+            if self.args.stats:
+                result["stats"] = module.get_stats()["commands"]
+            
+        return result
+    
+    def _run_fleet(self):
+        """Run read, write, verify or version on many ports in parallel"""
+        try:
+            targets = self._fleet_targets()
+        except Exception as e:
+            logger.error(f"Failed to load manifest: {e}")
+            return 1
+            
+        if not targets:
+            logger.error("No ports specified (--ports or --manifest)")
             return 1
+            
+        params = {}
+        if self.args.action in ('write', 'verify'):
+            params = self._collect_params()
+            if not params:
+                logger.error("No parameters specified to write or verify")
+                return 1
+        
+        logger.info(f"Running {self.args.action} on {len(targets)} port(s) with {self.args.workers} worker(s)")
+        start = time.monotonic()
+        
+        # One E32Module per port, at most --workers ports in flight at once
+        with ThreadPoolExecutor(max_workers=max(1, self.args.workers)) as executor:
+            futures = [executor.submit(self._fleet_worker, port, baudrate, params) for port, baudrate in targets]
+            results = [future.result() for future in futures]
+        
+        failed = [r for r in results if not r["ok"] or r.get("match") is False]
+        report = {
+            "action": self.args.action,
+            "elapsed_ms": round((time.monotonic() - start) * 1000, 1),
+            "succeeded": len(results) - len(failed),
+            "failed": len(failed),
+            "ports": results,
+        }
+        
+        print(json.dumps(report, indent=4))
+        if self.args.output:
+            try:
+                with open(self.args.output, 'w') as f:
+                    json.dump(report, f, indent=4)
+                logger.info(f"Fleet report saved to {self.args.output}")
+            except Exception as e:
+                logger.error(f"Failed to save fleet report: {e}")
+                
+        return 0 if not failed else 1
 
+def _add_parameter_arguments(parser):
+    """Add the parameter options shared by the write and fleet commands"""
+    parser.add_argument('--input', '-i', help='Load parameters from file')
+    parser.add_argument('--address', type=int, help='Module address (0-65535)')
+    parser.add_argument('--channel', type=int, help='Channel (0-83)')
+    parser.add_argument('--uart-baud', type=int, help='UART baudrate index (0-7)')
+    parser.add_argument('--parity', type=int, help='UART parity (0-3)')
+    parser.add_argument('--air-rate', type=int, help='Air rate index (0-7)')
+    parser.add_argument('--power', type=int, help='Transmit power index (0-3)')
+    parser.add_argument('--fixed-trans', type=bool, help='Fixed transmission mode (True/False)')
+    parser.add_argument('--io-drive', type=bool, help='IO drive mode (True=Push-Pull, False=Open-Collector)')
+    parser.add_argument('--wake-time', type=int, help='Wake-up time index (0-7)')
+    parser.add_argument('--fec', type=bool, help='FEC enable (True/False)')
+    parser.add_argument('--skip-unchanged', action='store_true', help='Skip the write if the module already has these parameters')
+    parser.add_argument('--volatile', action='store_true', help='Apply without saving to flash (C2, lost on reset)')
 
 def setup_arg_parser():
     """Set up the argument parser for CLI mode"""
@@ -1762,7 +3746,14 @@ def setup_arg_parser():
     parser.add_argument('--m0-pin', type=int, help='GPIO pin number for M0 pin')
     parser.add_argument('--m1-pin', type=int, help='GPIO pin number for M1 pin')
     parser.add_argument('--aux-pin', type=int, help='GPIO pin number for AUX pin')
+    parser.add_argument('--gpio-backend', choices=sorted(GPIO_BACKENDS), default='rpi',
+                        help='GPIO library: rpi (RPi.GPIO, BCM numbers) or gpiod (gpiochip line offsets) (default: rpi)')
+    parser.add_argument('--gpio-chip', default='/dev/gpiochip0',
+                        help='GPIO chip for the gpiod backend (default: /dev/gpiochip0)')
     parser.add_argument('--debug', action='store_true', help='Enable debug logging')
+    parser.add_argument('--stats', action='store_true', help='Print per-command latency statistics')
+    parser.add_argument('--socket', help='Unix socket of the daemon (default: $E32_DAEMON_SOCKET or a per-user path)')
+    parser.add_argument('--no-daemon', action='store_true', help='Open the port directly even if a daemon is running')
     
     # Create subparsers for different commands
     subparsers = parser.add_subparsers(dest='command', help='Command to execute')
@@ -1773,17 +3764,7 @@ def setup_arg_parser():
     
     # write command
     write_parser = subparsers.add_parser('write', help='Write module parameters')
-    write_parser.add_argument('--input', '-i', help='Load parameters from file')
-    write_parser.add_argument('--address', type=int, help='Module address (0-65535)')
-    write_parser.add_argument('--channel', type=int, help='Channel (0-83)')
-    write_parser.add_argument('--uart-baud', type=int, help='UART baudrate index (0-7)')
-    write_parser.add_argument('--parity', type=int, help='UART parity (0-3)')
-    write_parser.add_argument('--air-rate', type=int, help='Air rate index (0-7)')
-    write_parser.add_argument('--power', type=int, help='Transmit power index (0-3)')
-    write_parser.add_argument('--fixed-trans', type=bool, help='Fixed transmission mode (True/False)')
-    write_parser.add_argument('--io-drive', type=bool, help='IO drive mode (True=Push-Pull, False=Open-Collector)')
-    write_parser.add_argument('--wake-time', type=int, help='Wake-up time index (0-7)')
-    write_parser.add_argument('--fec', type=bool, help='FEC enable (True/False)')
+    _add_parameter_arguments(write_parser)
     
     # reset command
     subparsers.add_parser('reset', help='Reset the module')
@@ -1801,13 +3782,42 @@ def setup_arg_parser():
     # load-config command
     load_parser = subparsers.add_parser('load-config', help='Load and apply configuration from file')
     load_parser.add_argument('--input', '-i', required=True, help='Input file')
+    load_parser.add_argument('--skip-unchanged', action='store_true', help='Skip the write if the module already has these parameters')
+    load_parser.add_argument('--volatile', action='store_true', help='Apply without saving to flash (C2, lost on reset)')
     
     # scan-ports command
     subparsers.add_parser('scan-ports', help='Scan and display available serial ports')
     
     # send-data command
     send_parser = subparsers.add_parser('send-data', help='Send data through the module')
-    send_parser.add_argument('--data', required=True, help='Data to send')
+    send_source = send_parser.add_mutually_exclusive_group(required=True)
+    send_source.add_argument('--data', help='Text to send')
+    send_source.add_argument('--file', '-f', help='Send the contents of a file (binary)')
+    send_source.add_argument('--stdin', action='store_true', help='Send everything read from standard input')
+    send_parser.add_argument('--air-rate', type=int, help='Air rate index (0-7) used to pace the transmission')
+    
+    # receive command
+    receive_parser = subparsers.add_parser('receive', aliases=['monitor'],
+                                           help='Stream received packets to stdout as JSON Lines')
+    receive_parser.add_argument('--count', type=int, help='Stop after this many packets')
+    receive_parser.add_argument('--duration', type=float, help='Stop after this many seconds')
+    receive_parser.add_argument('--gap', type=float, default=10,
+                                help='Pause in ms that ends a packet (default: 10)')
+    receive_parser.add_argument('--max-packet', type=int, default=512,
+                                help='Largest packet in bytes; longer bursts are split (default: 512)')
+    
+    # daemon command
+    subparsers.add_parser('daemon', help='Keep modules connected and serve CLI commands over a Unix socket')
+    
+    # fleet command
+    fleet_parser = subparsers.add_parser('fleet', help='Run a command on many modules in parallel')
+    fleet_parser.add_argument('--ports', nargs='+', help='Serial ports or glob patterns (e.g., /dev/ttyUSB*)')
+    fleet_parser.add_argument('--manifest', help='JSON file listing ports (names or {"port", "baudrate"} objects)')
+    fleet_parser.add_argument('--action', choices=['read', 'write', 'verify', 'version'], default='read',
+                              help='Command to run on every module (default: read)')
+    fleet_parser.add_argument('--workers', type=int, default=16, help='Maximum ports handled at once (default: 16)')
+    fleet_parser.add_argument('--output', '-o', help='Save the JSON report to file')
+    _add_parameter_arguments(fleet_parser)
     
     return parser
 
@@ -1819,6 +3829,13 @@ def main():
     # Set up logging level
     if args.debug:
         logging.getLogger().setLevel(logging.DEBUG)
+        
+    # receive (JSON Lines) and fleet (JSON report) write machine-readable output
+    # to stdout, so the log goes to stderr instead
+    if args.command in ('receive', 'monitor', 'fleet'):
+        for handler in logging.getLogger().handlers:
+            if isinstance(handler, logging.StreamHandler) and handler.stream is sys.stdout:
+                handler.setStream(sys.stderr)
     
     # Run in CLI mode if requested
     if args.cli:
@@ -1826,7 +3843,7 @@ def main():
             parser.print_help()
             return 1
             
-        if args.command != 'scan-ports' and not args.port:
+        if args.command not in ('scan-ports', 'fleet', 'daemon') and not args.port:
             logger.error("Serial port must be specified (--port)")
             return 1
             
@@ -1844,4 +3861,7 @@ def main():
         return 0
 
 if __name__ == "__main__":
+    # e32_daemon, e32_async and e32_simulator import e32_configurator by name; let them
+    # share this copy instead of loading the file again with its own logger and state
+    sys.modules.setdefault("e32_configurator", sys.modules[__name__])
     sys.exit(main())
\ No newline at end of file
@@ -0,0 +1,497 @@
+#!/usr/bin/env python3
+"""
+E32 Configurator Daemon
+-----------------------
+Keeps E32Module instances connected and serves them over a Unix domain socket,
+so scripts that run many CLI commands do not reopen and reprobe the serial port
+(which can also toggle DTR on some adapters) for every command.
+
+Protocol: one JSON object per line in each direction.
+    request:  {"method": "read", "port": "/dev/ttyUSB0", "baudrate": 9600, ...}
+    response: {"ok": true, "result": ...} or {"ok": false, "error": "..."}
+
+Methods (all except ping, ports and shutdown take "port" and "baudrate"):
+    ping, ports, open, close, read, write, version, reset, factory_reset,
+    mode, send, receive, stats, shutdown
+Binary data ("send" data, "receive" result) is hex encoded.
+
+The CLI uses a running daemon automatically for the commands it can serve.
+
+Usage:
+    python e32_configurator.py --cli daemon
+    python e32_configurator.py --cli read --port /dev/ttyUSB0   # served by the daemon
+"""
+
+import argparse
+import io
+import json
+import os
+import signal
+import socket
+import socketserver
+import stat
+import sys
+import tempfile
+import threading
+import logging
+
+from e32_configurator import E32Module, ModuleMode, GPIO_BACKENDS, TX_BUFFER_SIZE
+
+logger = logging.getLogger("E32-Daemon")
+
+
+def default_socket_path():
+    """Socket path used when --socket is not given
+    Without XDG_RUNTIME_DIR the socket goes in a per-user directory under the
+    temporary directory, which the daemon creates accessible to its owner only."""
+    if os.environ.get("E32_DAEMON_SOCKET"):
+        return os.environ["E32_DAEMON_SOCKET"]
+    if os.environ.get("XDG_RUNTIME_DIR"):
+        return os.path.join(os.environ["XDG_RUNTIME_DIR"], "e32-configurator.sock")
+    uid = os.getuid() if hasattr(os, "getuid") else 0
+    return os.path.join(tempfile.gettempdir(), f"e32-configurator-{uid}", "daemon.sock")
+
+
+def _is_own_socket(path):
+    """True if path is a socket owned by the current user
+    Checked before a socket is trusted or removed, since anyone may create a
+    file at a predictable path first."""
+    try:
+        st = os.lstat(path)
+    except OSError:
+        return False
+    if not stat.S_ISSOCK(st.st_mode):
+        return False
+    return not hasattr(os, "getuid") or st.st_uid == os.getuid()
+
+
+def _prepare_socket_directory(path):
+    """Create the socket's directory (owner only) if needed; returns an error or None
+    A directory that another user could replace the socket in is refused."""
+    directory = os.path.dirname(os.path.abspath(path))
+    try:
+        os.makedirs(directory, mode=0o700, exist_ok=True)
+        st = os.stat(directory)
+    except OSError as e:
+        return f"Cannot create {directory}: {e}"
+    if hasattr(os, "getuid") and st.st_uid not in (os.getuid(), 0):
+        return f"{directory} belongs to another user"
+    if st.st_mode & (stat.S_IWGRP | stat.S_IWOTH) and not st.st_mode & stat.S_ISVTX:
+        return f"{directory} is writable by other users"
+    return None
+
+
+class E32Daemon:
+    """
+    Serves connected E32Module instances to local clients
+    Requests for one port are serialized by that module's I/O lock, so clients
+    can share a port safely; different ports are served concurrently. A client
+    connection is attached to every port it uses until it disconnects, and a
+    port is only reopened at another baudrate or closed when no other client
+    is attached to it.
+    """
+    def __init__(self, socket_path=None, m0_pin=None, m1_pin=None, aux_pin=None, use_gpio=False,
+                 gpio_backend=None, gpio_chip=None):
+        self.socket_path = socket_path or default_socket_path()
+        self.module_options = {"m0_pin": m0_pin, "m1_pin": m1_pin, "aux_pin": aux_pin, "use_gpio": use_gpio,
+                               "gpio_backend": gpio_backend, "gpio_chip": gpio_chip}
+        self.modules = {}
+        self._clients = {}                # Port -> client connections attached to it
+        self._local = threading.local()  # Client of the request being dispatched on this thread
+        self._lock = threading.Lock()
+        self._server = None
+
+    def _module(self, request):
+        """Return the connected module for the request's port, opening it if needed"""
+        port = request.get("port")
+        if not port:
+            raise ValueError("No port given")
+        baudrate = int(request.get("baudrate", 9600))
+        client = getattr(self._local, "client", None)
+
+        with self._lock:
+            module = self.modules.get(port)
+            if module is not None and module.baudrate != baudrate:
+                others = self._other_clients(port, client)
+                if others:
+                    raise IOError(f"{port} is open at {module.baudrate} baud for {others} other client(s), "
+                                  f"not reopening it at {baudrate} baud")
+                logger.info(f"Reopening {port} at {baudrate} baud")
+                module.disconnect()
+                module = None
+            if module is None:
+                module = E32Module(port=port, baudrate=baudrate, **self.module_options)
+                if not module.connect():
+                    raise IOError(f"Failed to connect to module on {port}")
+                self.modules[port] = module
+            if client is not None:
+                self._clients.setdefault(port, set()).add(client)
+            return module
+
+    def _other_clients(self, port, client):
+        """Number of clients other than client attached to port (lock must be held)"""
+        return len(self._clients.get(port, set()) - {client})
+
+    def detach(self, client):
+        """Forget a client connection that has ended"""
+        with self._lock:
+            for clients in self._clients.values():
+                clients.discard(client)
+
+    def _close(self, port):
+        """Disconnect one module, unless other clients are attached to it"""
+        client = getattr(self._local, "client", None)
+        with self._lock:
+            others = self._other_clients(port, client)
+            if others:
+                raise IOError(f"{port} is in use by {others} other client(s)")
+            module = self.modules.pop(port, None)
+            self._clients.pop(port, None)
+        if module is None:
+            return False
+        module.disconnect()
+        return True
+
+    def close_all(self):
+        """Disconnect every module"""
+        with self._lock:
+            modules = list(self.modules.values())
+            self.modules = {}
+            self._clients = {}
+        for module in modules:
+            module.disconnect()
+
+    def dispatch(self, request, client=None):
+        """Execute one request and return the response object
+        client identifies the connection the request came from (any hashable object)."""
+        self._local.client = client
+        method = request.get("method")
+        handler = getattr(self, f"_rpc_{method}", None) if isinstance(method, str) else None
+        if handler is None:
+            return {"ok": False, "error": f"Unknown method: {method}"}
+        try:
+            return {"ok": True, "result": handler(request)}
+        except Exception as e:
+            logger.error(f"{method} failed: {e}")
+            return {"ok": False, "error": str(e)}
+
+    def _rpc_ping(self, request):
+        """Liveness check"""
+        return {"pid": os.getpid()}
+
+    def _rpc_ports(self, request):
+        """Ports held open, with their baudrate"""
+        with self._lock:
+            return {port: module.baudrate for port, module in self.modules.items()}
+
+    def _rpc_open(self, request):
+        """Open the port if needed and describe the module's pin setup"""
+        module = self._module(request)
+        return {
+            "use_gpio": module.use_gpio,
+            "m0_pin": module.m0_pin,
+            "m1_pin": module.m1_pin,
+            "aux_pin": module.aux_pin,
+        }
+
+    def _rpc_close(self, request):
+        """Disconnect the port"""
+        return self._close(request.get("port"))
+
+    def _rpc_read(self, request):
+        """E32Module.get_parameters"""
+        return self._module(request).get_parameters()
+
+    def _rpc_write(self, request):
+        """E32Module.set_parameters; params, skip_unchanged and persist as in the CLI"""
+        module = self._module(request)
+        with module._io_lock:
+            success = module.set_parameters(
+                request.get("params", {}),
+                skip_unchanged=bool(request.get("skip_unchanged")),
+                persist=request.get("persist", True)
+            )
+            return {"success": success, "skipped": module.last_write_skipped}
+
+    def _rpc_version(self, request):
+        """E32Module.version"""
+        return self._module(request).version()
+
+    def _rpc_reset(self, request):
+        """E32Module.reset_module"""
+        return self._module(request).reset_module()
+
+    def _rpc_factory_reset(self, request):
+        """E32Module.factory_reset"""
+        return self._module(request).factory_reset()
+
+    def _rpc_mode(self, request):
+        """E32Module.set_mode; mode is a ModuleMode name such as NORMAL"""
+        return self._module(request).set_mode(ModuleMode[request["mode"]])
+
+    def _rpc_send(self, request):
+        """E32Module.send_stream with hex data; returns the bytes written"""
+        data = bytes.fromhex(request.get("data", ""))
+        return self._module(request).send_stream(io.BytesIO(data), air_data_rate=request.get("air_data_rate"))
+
+    def _rpc_receive(self, request):
+        """E32Module.read_data; returns the data as hex"""
+        data = self._module(request).read_data(
+            timeout=float(request.get("timeout", 0.25)),
+            max_bytes=int(request.get("max_bytes", 4096))
+        )
+        return data.hex()
+
+    def _rpc_stats(self, request):
+        """E32Module.get_stats"""
+        return self._module(request).get_stats()
+
+    def _rpc_shutdown(self, request):
+        """Stop the daemon"""
+        # shutdown() waits for serve_forever to return, so it must run on another thread
+        threading.Thread(target=self._server.shutdown, daemon=True).start()
+        return True
+
+    def serve_forever(self):
+        """Listen on the socket until shutdown, SIGINT or SIGTERM"""
+        error = _prepare_socket_directory(self.socket_path)
+        if error:
+            logger.error(f"Not listening on {self.socket_path}: {error}")
+            return False
+        if os.path.lexists(self.socket_path):
+            if not _is_own_socket(self.socket_path):
+                logger.error(f"Not listening on {self.socket_path}: it exists and is not a socket owned by you")
+                return False
+            if DaemonClient(self.socket_path).ping():
+                logger.error(f"A daemon is already listening on {self.socket_path}")
+                return False
+            os.unlink(self.socket_path)  # Left over from a daemon that did not exit cleanly
+
+        daemon = self
+
+        class Handler(socketserver.StreamRequestHandler):
+            def handle(self):
+                for line in self.rfile:
+                    try:
+                        request = json.loads(line)
+                        if not isinstance(request, dict):
+                            raise ValueError("Request must be a JSON object")
+                        response = daemon.dispatch(request, client=self)
+                    except ValueError as e:
+                        response = {"ok": False, "error": f"Invalid request: {e}"}
+                    self.wfile.write(json.dumps(response).encode("utf-8") + b"\n")
+                    self.wfile.flush()
+
+            def finish(self):
+                daemon.detach(self)
+                super().finish()
+
+        class Server(socketserver.ThreadingMixIn, socketserver.UnixStreamServer):
+            daemon_threads = True
+
+        # Only the owner may connect, from the moment the socket is created
+        umask = os.umask(0o177)
+        try:
+            self._server = Server(self.socket_path, Handler)
+        finally:
+            os.umask(umask)
+        if threading.current_thread() is threading.main_thread():
+            signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+        logger.info(f"Daemon listening on {self.socket_path}")
+        try:
+            self._server.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            self._server.server_close()
+            self.close_all()
+            if _is_own_socket(self.socket_path):
+                try:
+                    os.unlink(self.socket_path)
+                except OSError:
+                    pass
+            logger.info("Daemon stopped")
+        return True
+
+
+class DaemonClient:
+    """
+    Client side of the daemon protocol
+    Stands in for E32Module in the CLI: connect() asks the daemon to open the port
+    and the methods used by the CLI commands are forwarded to it. Errors are logged
+    and reported like E32Module does (None/False results).
+    """
+    def __init__(self, socket_path=None, port=None, baudrate=9600):
+        self.socket_path = socket_path or default_socket_path()
+        self.port = port
+        self.baudrate = baudrate
+        self.last_write_skipped = False
+        self.use_gpio = False
+        self.m0_pin = None
+        self.m1_pin = None
+        self.aux_pin = None
+        self._sock = None
+        self._file = None
+
+    def available(self):
+        """Check whether a daemon is listening, keeping the connection if so"""
+        if not hasattr(socket, "AF_UNIX") or not os.path.lexists(self.socket_path):
+            return False
+        if not _is_own_socket(self.socket_path):
+            logger.warning(f"Ignoring {self.socket_path}: not a socket owned by you")
+            return False
+        try:
+            self._sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            self._sock.connect(self.socket_path)
+            self._file = self._sock.makefile("rwb")
+            return True
+        except OSError:
+            self._close_socket()
+            return False
+
+    def ping(self):
+        """Check whether a daemon answers on the socket"""
+        if not self.available():
+            return False
+        try:
+            return self._request("ping").get("ok", False)
+        except (OSError, ValueError):
+            return False
+        finally:
+            self._close_socket()
+
+    def _close_socket(self):
+        """Drop the connection to the daemon"""
+        if self._file:
+            self._file.close()
+            self._file = None
+        if self._sock:
+            self._sock.close()
+            self._sock = None
+
+    def _request(self, method, **params):
+        """Send one request and return the raw response object"""
+        request = {"method": method, "port": self.port, "baudrate": self.baudrate}
+        request.update(params)
+        self._file.write(json.dumps(request).encode("utf-8") + b"\n")
+        self._file.flush()
+        line = self._file.readline()
+        if not line:
+            raise ConnectionError("Daemon closed the connection")
+        return json.loads(line)
+
+    def _call(self, method, default=None, **params):
+        """Call a method on the daemon and return its result, or default on error"""
+        if self._file is None and not self.available():
+            logger.error(f"Daemon not running on {self.socket_path}")
+            return default
+        try:
+            response = self._request(method, **params)
+        except (OSError, ValueError) as e:
+            logger.error(f"Daemon request {method} failed: {e}")
+            self._close_socket()
+            return default
+        if not response.get("ok"):
+            logger.error(f"Daemon: {response.get('error')}")
+            return default
+        return response.get("result")
+
+    def connect(self):
+        """Ask the daemon to open the port; returns False if it cannot"""
+        info = self._call("open")
+        if info is None:
+            return False
+        self.use_gpio = info["use_gpio"]
+        self.m0_pin = info["m0_pin"]
+        self.m1_pin = info["m1_pin"]
+        self.aux_pin = info["aux_pin"]
+        logger.info(f"Using daemon on {self.socket_path} for {self.port}")
+        return True
+
+    def disconnect(self):
+        """Close the connection to the daemon; the daemon keeps the port open"""
+        self._close_socket()
+
+    def _has_aux(self):
+        """Check whether the daemon's module can read the AUX pin"""
+        return bool(self.use_gpio and self.aux_pin)
+
+    def get_parameters(self):
+        """Read all parameters from the module"""
+        return self._call("read")
+
+    def set_parameters(self, params, skip_unchanged=False, persist=True):
+        """Write parameters to the module"""
+        result = self._call("write", params=params, skip_unchanged=skip_unchanged, persist=persist)
+        self.last_write_skipped = bool(result and result["skipped"])
+        return bool(result and result["success"])
+
+    def version(self):
+        """Get module version"""
+        return self._call("version")
+
+    def reset_module(self):
+        """Reset the module"""
+        return self._call("reset", default=False)
+
+    def factory_reset(self):
+        """Reset the module to factory defaults"""
+        return self._call("factory_reset", default=False)
+
+    def set_mode(self, mode, probe=True):
+        """Set the module's operating mode"""
+        return self._call("mode", default=False, mode=mode.name)
+
+    def read_data(self, timeout=0.25, max_bytes=4096, copy=True):
+        """Wait for data received over the air"""
+        return bytes.fromhex(self._call("receive", default="", timeout=timeout, max_bytes=max_bytes))
+
+    def send_stream(self, stream, air_data_rate=None):
+        """Forward a stream to the daemon in blocks of half the transmit buffer
+        The daemon's module paces the blocks; its transmit buffer model carries
+        over from one block to the next. Raises IOError if a block is not sent."""
+        read = getattr(stream, 'read1', stream.read)
+        sent = 0
+        while True:
+            block = read(TX_BUFFER_SIZE // 2)
+            if not block:
+                break
+            written = self._call("send", default=0, data=block.hex(), air_data_rate=air_data_rate)
+            if not written:
+                raise IOError(f"Daemon failed to send data after {sent} bytes")
+            sent += written
+        return sent
+
+    def get_stats(self):
+        """Return the daemon's command statistics for this port"""
+        return self._call("stats", default={"port": self.port, "commands": {}})
+
+    def shutdown(self):
+        """Stop the daemon"""
+        return self._call("shutdown", default=False)
+
+
+def main():
+    """Run the daemon until interrupted"""
+    parser = argparse.ArgumentParser(description='Serve E32 modules over a Unix domain socket')
+    parser.add_argument('--socket', help=f'Socket path (default: {default_socket_path()})')
+    parser.add_argument('--use-gpio', action='store_true', help='Use GPIO pins for mode control (Raspberry Pi)')
+    parser.add_argument('--m0-pin', type=int, help='GPIO pin number for M0 pin')
+    parser.add_argument('--m1-pin', type=int, help='GPIO pin number for M1 pin')
+    parser.add_argument('--aux-pin', type=int, help='GPIO pin number for AUX pin')
+    parser.add_argument('--gpio-backend', choices=sorted(GPIO_BACKENDS), default='rpi',
+                        help='GPIO library: rpi (RPi.GPIO, BCM numbers) or gpiod (gpiochip line offsets) (default: rpi)')
+    parser.add_argument('--gpio-chip', default='/dev/gpiochip0',
+                        help='GPIO chip for the gpiod backend (default: /dev/gpiochip0)')
+    args = parser.parse_args()
+
+    daemon = E32Daemon(args.socket, m0_pin=args.m0_pin, m1_pin=args.m1_pin, aux_pin=args.aux_pin,
+                       use_gpio=args.use_gpio, gpio_backend=args.gpio_backend, gpio_chip=args.gpio_chip)
+    return 0 if daemon.serve_forever() else 1
+
+
+if __name__ == "__main__":
+    # Let later imports of e32_daemon by name share this copy of the module
+    sys.modules.setdefault("e32_daemon", sys.modules[__name__])
+    sys.exit(main())
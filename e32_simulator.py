@@ -0,0 +1,368 @@
+#!/usr/bin/env python3
+"""
+E32 LoRa Module Simulator
+-------------------------
+A software model of an EBYTE E32 module that listens on a Linux pseudo-terminal,
+so E32Module, the CLI and the GUI can be exercised and benchmarked without hardware.
+
+The simulator implements the configuration commands with the same register layout
+that E32Module encodes and decodes:
+    - C0 + 5 bytes: set parameters and save them (echoed back)
+    - C2 + 5 bytes: set parameters without saving (echoed back)
+    - C1 C1 C1:     read parameters (answered with a C0 frame, like most E32 modules)
+    - C3 C3 C3:     read version
+    - C4 C4 C4:     reset (reloads the saved parameters, no answer)
+
+Outside configuration mode bytes written by the host are transmitted over a
+simulated air link: they go into a 512-byte buffer that drains in 58-byte
+sub-packets at the configured air data rate, AUX is LOW while the buffer is busy
+and bytes that do not fit are dropped. Packets reach linked simulators on the
+same channel, using transparent or fixed transmission rules.
+
+Usage:
+    python e32_simulator.py                 # prints the pty path, Ctrl-C to stop
+    python e32_simulator.py --latency 0.005 --mode normal
+
+From Python:
+    with SimulatedE32(response_latency=0.005) as sim:
+        module = E32Module(port=sim.port, manual_config=True)
+
+SimulatedGPIO stands in for the M0, M1 and AUX wiring, so the GPIO code paths
+(mode pins, AUX waits) run against the simulator too:
+    with SimulatedE32(mode_switch_time=0.01) as sim:
+        module = E32Module(port=sim.port, m0_pin=17, m1_pin=27, aux_pin=22,
+                           gpio_backend=SimulatedGPIO(sim))
+"""
+
+import argparse
+import os
+import select
+import sys
+import threading
+import time
+import tty
+import logging
+
+from e32_configurator import (E32Module, ModuleMode, FakeGPIOBackend, AIR_DATA_RATES, MODE_PINS, TX_BUFFER_SIZE,
+                              SUB_PACKET_SIZE)
+
+logger = logging.getLogger("E32-Simulator")
+
+# Default registers: address 0, 9600 8N1, 2.4k air rate, channel 23, push-pull, FEC on
+DEFAULT_REGISTERS = bytes([0x00, 0x00, 0x1A, 0x17, 0x44])
+
+# Default version frame payload (model, version, features)
+DEFAULT_VERSION = bytes([0x32, 0x44, 0x14])
+
+
+class SimulatedE32:
+    """
+    Simulated E32 module attached to the slave side of a pseudo-terminal
+    """
+    def __init__(self, registers=DEFAULT_REGISTERS, mode=ModuleMode.CONFIGURATION, response_latency=0.0,
+                 flash_write_latency=0.0, reset_time=0.0, mode_switch_time=0.0, time_scale=1.0,
+                 version=DEFAULT_VERSION):
+        self.registers = bytearray(registers)        # Registers in effect
+        self.saved_registers = bytes(registers)      # Registers in flash
+        self.version = bytes(version)
+        self.mode = mode
+
+        # Timing model (seconds)
+        self.response_latency = response_latency      # Delay before answering a config command
+        self.flash_write_latency = flash_write_latency  # Extra delay for C0 (saved) writes
+        self.reset_time = reset_time                  # AUX stays LOW this long after C4
+        self.mode_switch_time = mode_switch_time      # AUX stays LOW this long after a mode change
+        self.time_scale = time_scale                  # Multiplier applied to air time
+        self.drop_responses = 0                       # Commands still to be lost, as on a noisy line
+
+        # Statistics
+        self.commands = 0
+        self.flash_writes = 0
+        self.bytes_transmitted = 0
+        self.bytes_dropped = 0
+        self.packets_transmitted = []
+
+        self._peers = []
+        self._lock = threading.Lock()
+        self._aux_cond = threading.Condition(self._lock)
+        self._busy_until = 0.0
+        self._tx_buffer = bytearray()
+        self._tx_target = None
+        self._pending = bytearray()
+        self._running = False
+
+        # Create the pseudo-terminal; the host opens the slave side by name
+        self._master_fd, self._slave_fd = os.openpty()
+        tty.setraw(self._slave_fd)
+        self.port = os.ttyname(self._slave_fd)
+
+        self._rx_thread = threading.Thread(target=self._serve, daemon=True)
+        self._air_thread = threading.Thread(target=self._transmit, daemon=True)
+
+    def start(self):
+        """Start serving the pseudo-terminal"""
+        self._running = True
+        self._rx_thread.start()
+        self._air_thread.start()
+        logger.info(f"Simulated E32 listening on {self.port}")
+        return self
+
+    def close(self):
+        """Stop the simulator and close the pseudo-terminal"""
+        self._running = False
+        with self._aux_cond:
+            self._aux_cond.notify_all()
+        for thread in (self._rx_thread, self._air_thread):
+            if thread.is_alive():
+                thread.join(timeout=1)
+        for fd in (self._master_fd, self._slave_fd):
+            try:
+                os.close(fd)
+            except OSError:
+                pass
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def link(self, other):
+        """Put this module and another one on the same simulated air link"""
+        if other not in self._peers:
+            self._peers.append(other)
+        if self not in other._peers:
+            other._peers.append(self)
+
+    @property
+    def parameters(self):
+        """Decoded view of the registers currently in effect"""
+        return E32Module._decode_registers(self.registers)
+
+    @property
+    def air_data_rate(self):
+        """Air data rate in bits per second"""
+        return AIR_DATA_RATES[self.registers[2] & 0x07]
+
+    @property
+    def aux(self):
+        """AUX pin level: True (HIGH) when the module is idle and ready"""
+        with self._lock:
+            return self._aux_locked()
+
+    def _aux_locked(self):
+        return not self._tx_buffer and time.monotonic() >= self._busy_until
+
+    def wait_aux(self, level=True, timeout=None):
+        """Block until AUX reaches level; returns False on timeout"""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._aux_cond:
+            while self._aux_locked() != level:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    return False
+                # Busy periods end on a timer, so never sleep past them
+                wait = max(0.0, self._busy_until - now) if self._busy_until > now else None
+                if deadline is not None:
+                    wait = deadline - now if wait is None else min(wait, deadline - now)
+                self._aux_cond.wait(wait)
+            return True
+
+    def _set_busy(self, seconds):
+        """Hold AUX LOW for the given time (lock must be held)"""
+        if seconds > 0:
+            self._busy_until = max(self._busy_until, time.monotonic() + seconds)
+        self._aux_cond.notify_all()
+
+    def set_mode(self, mode):
+        """Change the operating mode, as if M0/M1 had been driven"""
+        with self._lock:
+            if mode != self.mode:
+                self.mode = mode
+                self._pending.clear()
+                self._set_busy(self.mode_switch_time)
+
+    def inject(self, data, channel=None):
+        """Deliver a packet to the host as if it had been received over the air
+        The packet is dropped if the module is in configuration mode or if a
+        channel is given that does not match the module's channel."""
+        if self.mode == ModuleMode.CONFIGURATION:
+            return False
+        if channel is not None and channel != self.registers[3]:
+            return False
+        os.write(self._master_fd, bytes(data))
+        return True
+
+    def _serve(self):
+        """Read bytes written by the host and act on them according to the mode"""
+        while self._running:
+            try:
+                ready, _, _ = select.select([self._master_fd], [], [], 0.1)
+                if not ready:
+                    continue
+                data = os.read(self._master_fd, 4096)
+            except OSError:
+                break
+
+            if self.mode == ModuleMode.CONFIGURATION:
+                self._pending.extend(data)
+                self._handle_commands()
+            else:
+                self._queue_transmission(data)
+
+    def _handle_commands(self):
+        """Execute every complete configuration command in the pending buffer"""
+        while self._pending:
+            header = self._pending[0]
+            if header in (0xC0, 0xC2):
+                if len(self._pending) < 6:
+                    return
+                frame = bytes(self._pending[:6])
+                del self._pending[:6]
+                self._reply(frame, save=header == 0xC0)
+            elif header in (0xC1, 0xC3, 0xC4):
+                if len(self._pending) < 3:
+                    return
+                command = bytes(self._pending[:3])
+                del self._pending[:3]
+                if command != bytes([header]) * 3:
+                    continue
+                self._reply(command)
+            else:
+                # Not a command header: the real module ignores it
+                del self._pending[:1]
+
+    def _reply(self, command, save=False):
+        """Answer one configuration command"""
+        self.commands += 1
+        if self.drop_responses:
+            self.drop_responses -= 1
+            return
+        header = command[0]
+        if self.response_latency:
+            time.sleep(self.response_latency)
+
+        if header in (0xC0, 0xC2):
+            self.registers[:] = command[1:6]
+            if save:
+                if self.flash_write_latency:
+                    time.sleep(self.flash_write_latency)
+                self.saved_registers = bytes(self.registers)
+                self.flash_writes += 1
+            os.write(self._master_fd, bytes([header]) + bytes(self.registers))
+        elif header == 0xC1:
+            os.write(self._master_fd, bytes([0xC0]) + bytes(self.registers))
+        elif header == 0xC3:
+            os.write(self._master_fd, bytes([0xC3]) + self.version)
+        elif header == 0xC4:
+            with self._lock:
+                self.registers[:] = self.saved_registers
+                self._tx_buffer.clear()
+                self._set_busy(self.reset_time)
+
+    def _queue_transmission(self, data):
+        """Put host data into the transmit buffer, dropping what does not fit"""
+        with self._lock:
+            if not self._tx_buffer and self.registers[4] & 0x80:
+                # Fixed transmission: each burst starts with ADDH, ADDL, CHAN of the target
+                if len(data) < 3:
+                    self.bytes_dropped += len(data)
+                    return
+                self._tx_target = (data[0] << 8 | data[1], data[2])
+                data = data[3:]
+            elif not self._tx_buffer:
+                self._tx_target = ((self.registers[0] << 8) | self.registers[1], self.registers[3])
+
+            room = TX_BUFFER_SIZE - len(self._tx_buffer)
+            if len(data) > room:
+                self.bytes_dropped += len(data) - room
+                data = data[:room]
+            self._tx_buffer.extend(data)
+            self._aux_cond.notify_all()
+
+    def _transmit(self):
+        """Drain the transmit buffer in sub-packets at the air data rate"""
+        while self._running:
+            with self._aux_cond:
+                while self._running and not self._tx_buffer:
+                    self._aux_cond.wait(0.1)
+                if not self._running:
+                    return
+                packet = bytes(self._tx_buffer[:SUB_PACKET_SIZE])
+                target = self._tx_target
+                air_time = len(packet) * 8.0 / self.air_data_rate * self.time_scale
+
+            time.sleep(air_time)
+
+            with self._aux_cond:
+                del self._tx_buffer[:len(packet)]
+                self.bytes_transmitted += len(packet)
+                self.packets_transmitted.append(packet)
+                self._aux_cond.notify_all()
+
+            self._deliver(packet, target)
+
+    def _deliver(self, packet, target):
+        """Hand a transmitted packet to every linked module that would receive it"""
+        address, channel = target
+        for peer in self._peers:
+            peer_address = (peer.registers[0] << 8) | peer.registers[1]
+            if address in (peer_address, 0xFFFF) or peer_address == 0xFFFF:
+                peer.inject(packet, channel=channel)
+
+
+class SimulatedGPIO(FakeGPIOBackend):
+    """
+    GPIO backend wired to a SimulatedE32
+    Driving M0/M1 changes the simulator's mode and AUX follows its busy state.
+    """
+    def __init__(self, simulator, m0_pin=17, m1_pin=27, aux_pin=22):
+        super().__init__()
+        self.simulator = simulator
+        self.m0_pin = m0_pin
+        self.m1_pin = m1_pin
+        self.aux_pin = aux_pin
+        self.levels[m0_pin], self.levels[m1_pin] = MODE_PINS[simulator.mode]
+        self._modes = {levels: mode for mode, levels in MODE_PINS.items()}
+
+    def write(self, pin, level):
+        super().write(pin, level)
+        if pin in (self.m0_pin, self.m1_pin):
+            self.simulator.set_mode(self._modes[(self.levels[self.m0_pin], self.levels[self.m1_pin])])
+
+    def read(self, pin):
+        if pin == self.aux_pin:
+            return self.simulator.aux
+        return super().read(pin)
+
+    def wait_for_edge(self, pin, timeout):
+        if pin == self.aux_pin:
+            return self.simulator.wait_aux(True, timeout)
+        return super().wait_for_edge(pin, timeout)
+
+
+def main():
+    """Run a simulated module until interrupted"""
+    parser = argparse.ArgumentParser(description='Simulated E32 module on a pseudo-terminal')
+    parser.add_argument('--mode', choices=['config', 'normal'], default='config',
+                        help='Initial operating mode (default: config)')
+    parser.add_argument('--latency', type=float, default=0.0, help='Response latency in seconds (default: 0)')
+    parser.add_argument('--flash-latency', type=float, default=0.0,
+                        help='Extra latency for saved (C0) writes in seconds (default: 0)')
+    args = parser.parse_args()
+
+    logging.getLogger().setLevel(logging.INFO)
+    mode = ModuleMode.CONFIGURATION if args.mode == 'config' else ModuleMode.NORMAL
+
+    with SimulatedE32(mode=mode, response_latency=args.latency, flash_write_latency=args.flash_latency) as sim:
+        print(sim.port, flush=True)
+        try:
+            while True:
+                time.sleep(1)
+        except KeyboardInterrupt:
+            pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
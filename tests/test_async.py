@@ -0,0 +1,65 @@
+"""
+AsyncE32Module error handling tests against the simulated module
+"""
+
+import asyncio
+import time
+import unittest
+from unittest import mock
+
+from e32_async import AsyncE32Module
+from e32_simulator import SimulatedE32
+
+
+class AsyncErrorTest(unittest.TestCase):
+    """Errors are reported like E32Module does: logged, with None/False returned"""
+
+    def run_async(self, coroutine):
+        loop = asyncio.new_event_loop()
+        try:
+            return loop.run_until_complete(coroutine)
+        finally:
+            loop.close()
+
+    def test_disconnect_fails_pending_command(self):
+        async def run(port):
+            module = AsyncE32Module(port, manual_config=True)
+            self.assertTrue(await module.connect())
+            asyncio.get_running_loop().call_later(0.1, module.disconnect)
+            start = time.monotonic()
+            result = await module.send_command(bytes([0xC1, 0xC1, 0xC1]), timeout=2)
+            return result, time.monotonic() - start
+
+        with SimulatedE32(response_latency=1.0) as sim:
+            result, elapsed = self.run_async(run(sim.port))
+        self.assertIsNone(result)
+        self.assertLess(elapsed, 0.5)
+
+    def test_write_error_is_reported(self):
+        async def run(port):
+            async with AsyncE32Module(port, manual_config=True) as module:
+                with mock.patch("e32_async.os.write", side_effect=OSError(5, "Input/output error")):
+                    return (await module.get_parameters(), await module.set_parameters({"chan": 1}),
+                            await module.send_data(b"data"))
+
+        with SimulatedE32() as sim:
+            self.assertEqual(self.run_async(run(sim.port)), (None, False, False))
+
+    def test_parameter_read_is_retried(self):
+        async def run(port):
+            async with AsyncE32Module(port, manual_config=True) as module:
+                # The config mode probe loses the first response, the read the second
+                sim.drop_responses = 2
+                params = await module.get_parameters()
+                sim.drop_responses = 2
+                return params, await module.version()
+
+        with SimulatedE32() as sim:
+            params, version = self.run_async(run(sim.port))
+            self.assertEqual(sim.drop_responses, 0)
+        self.assertIsNotNone(params)
+        self.assertIsNotNone(version)
+
+
+if __name__ == "__main__":
+    unittest.main()
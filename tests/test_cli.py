@@ -0,0 +1,51 @@
+"""
+Command line tests against the simulated module
+"""
+
+import json
+import os
+import subprocess
+import sys
+import threading
+import unittest
+
+from e32_configurator import ModuleMode
+from e32_simulator import SimulatedE32
+
+CONFIGURATOR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "e32_configurator.py")
+
+
+class FleetOutputTest(unittest.TestCase):
+    """fleet prints its report as JSON on stdout, with the log kept on stderr"""
+
+    def test_fleet_stdout_is_json(self):
+        with SimulatedE32() as first, SimulatedE32() as second:
+            result = subprocess.run(
+                [sys.executable, CONFIGURATOR, "--cli", "--no-daemon", "fleet", "--ports", first.port, second.port],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+        self.assertEqual(result.returncode, 0, result.stderr.decode())
+        report = json.loads(result.stdout.decode())
+        self.assertEqual(report["succeeded"], 2)
+        self.assertEqual(len(report["ports"]), 2)
+
+
+class ReceiveOutputTest(unittest.TestCase):
+    """receive --stats keeps stdout to JSON Lines and prints the statistics on stderr"""
+
+    def test_receive_stats_go_to_stderr(self):
+        with SimulatedE32(mode=ModuleMode.NORMAL) as sim:
+            timer = threading.Timer(1.0, sim.inject, (b"hello",))
+            timer.start()
+            result = subprocess.run(
+                [sys.executable, CONFIGURATOR, "--cli", "--no-daemon", "--stats", "--port", sim.port,
+                 "receive", "--duration", "2"],
+                stdout=subprocess.PIPE, stderr=subprocess.PIPE, timeout=60)
+            timer.join()
+        self.assertEqual(result.returncode, 0, result.stderr.decode())
+        records = [json.loads(line) for line in result.stdout.decode().splitlines()]
+        self.assertEqual(len(records), 1)
+        self.assertIn("Command statistics", result.stderr.decode())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,63 @@
+"""
+Command retry and statistics tests against the simulated module
+"""
+
+import unittest
+from unittest import mock
+
+from e32_configurator import E32Module
+from e32_simulator import SimulatedE32
+
+
+class ReadRetryTest(unittest.TestCase):
+    """A lost response to a read-only command is retried and counted"""
+
+    def setUp(self):
+        self.sim = SimulatedE32().start()
+        self.module = E32Module(port=self.sim.port, timeout=0.2, manual_config=True)
+        self.assertTrue(self.module.connect())
+
+    def tearDown(self):
+        self.module.disconnect()
+        self.sim.close()
+
+    def test_parameter_read_is_retried(self):
+        with self.module.config_session() as ready:
+            self.assertTrue(ready)
+            self.module.get_parameters()  # Answered from the config mode probe
+            self.sim.drop_responses = 1
+            self.assertIsNotNone(self.module.get_parameters())
+        stats = self.module.get_stats()["commands"]["C1"]
+        self.assertEqual(stats["retries"], 1)
+        self.assertEqual(stats["timeouts"], 1)
+
+    def test_version_is_retried(self):
+        with self.module.config_session() as ready:
+            self.assertTrue(ready)
+            self.sim.drop_responses = 1
+            self.assertIsNotNone(self.module.version())
+        self.assertEqual(self.module.get_stats()["commands"]["C3"]["retries"], 1)
+
+
+class ResponseReadTest(unittest.TestCase):
+    """Reading responses does not reconfigure the port for every command"""
+
+    def test_commands_keep_the_port_settings(self):
+        with SimulatedE32() as sim:
+            module = E32Module(port=sim.port, manual_config=True)
+            self.assertTrue(module.connect())
+            try:
+                with module.config_session() as ready:
+                    self.assertTrue(ready)
+                    module.version()
+                    with mock.patch.object(module.serial, "_reconfigure_port") as reconfigure:
+                        for _ in range(5):
+                            self.assertIsNotNone(module.version())
+                            self.assertIsNotNone(module.get_parameters())
+                    reconfigure.assert_not_called()
+            finally:
+                module.disconnect()
+
+
+if __name__ == "__main__":
+    unittest.main()
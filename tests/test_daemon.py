@@ -0,0 +1,118 @@
+"""
+Daemon tests against the simulated module
+"""
+
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import time
+import unittest
+from unittest import mock
+
+from e32_configurator import E32CLI, setup_arg_parser
+from e32_daemon import DaemonClient, E32Daemon, _prepare_socket_directory, default_socket_path
+from e32_simulator import SimulatedE32
+
+
+class SharedPortTest(unittest.TestCase):
+    """A port shared by several clients is not reopened under them"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        self.socket_path = os.path.join(self.tmpdir, "e32.sock")
+        self.sim = SimulatedE32().start()
+        self.daemon = E32Daemon(self.socket_path)
+        self.thread = threading.Thread(target=self.daemon.serve_forever, daemon=True)
+        self.thread.start()
+        deadline = time.monotonic() + 5
+        while not DaemonClient(self.socket_path).ping():
+            self.assertLess(time.monotonic(), deadline, "daemon did not start")
+            time.sleep(0.01)
+
+    def tearDown(self):
+        DaemonClient(self.socket_path)._call("shutdown")
+        self.thread.join(5)
+        self.sim.close()
+        shutil.rmtree(self.tmpdir)
+
+    def client(self, baudrate=9600):
+        client = DaemonClient(self.socket_path, port=self.sim.port, baudrate=baudrate)
+        self.assertTrue(client.available())
+        return client
+
+    def test_baudrate_change_refused_while_shared(self):
+        first = self.client()
+        self.assertTrue(first.connect())
+        second = self.client(baudrate=19200)
+        self.assertFalse(second.connect())
+        self.assertIsNotNone(first.version())
+
+        # Closing the port is refused for the same reason
+        self.assertIsNone(second._call("close"))
+        self.assertEqual(self.daemon.modules[self.sim.port].baudrate, 9600)
+
+        # Once the first client has gone the port can be reopened
+        first.disconnect()
+        deadline = time.monotonic() + 5
+        while not second.connect():
+            self.assertLess(time.monotonic(), deadline)
+            time.sleep(0.05)
+        self.assertEqual(self.daemon.modules[self.sim.port].baudrate, 19200)
+        second.disconnect()
+
+    def test_socket_is_private(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket_path).st_mode), 0o600)
+
+    def test_socket_of_another_user_is_not_trusted(self):
+        with mock.patch("e32_daemon.os.getuid", return_value=os.getuid() + 1):
+            self.assertFalse(DaemonClient(self.socket_path).available())
+
+    def test_ignored_gpio_options_are_reported(self):
+        args = setup_arg_parser().parse_args(
+            ["--cli", "--port", self.sim.port, "--use-gpio", "--m0-pin", "17", "--m1-pin", "27", "read"])
+        cli = E32CLI(args)
+        cli.module = self.client()
+        self.assertTrue(cli.module.connect())
+        with self.assertLogs("E32-Configurator", "WARNING"):
+            cli._check_daemon_gpio()
+        cli.module.disconnect()
+
+
+class SocketPathTest(unittest.TestCase):
+    """The daemon neither trusts nor removes files it does not own"""
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_existing_file_is_not_replaced(self):
+        path = os.path.join(self.tmpdir, "e32.sock")
+        with open(path, "w") as f:
+            f.write("not a socket")
+        self.assertFalse(E32Daemon(path).serve_forever())
+        self.assertTrue(os.path.isfile(path))
+
+    def test_shared_directory_is_refused(self):
+        directory = os.path.join(self.tmpdir, "shared")
+        os.mkdir(directory)
+        os.chmod(directory, 0o777)
+        self.assertFalse(E32Daemon(os.path.join(directory, "e32.sock")).serve_forever())
+
+    def test_default_path_is_in_a_private_directory(self):
+        environ = {key: value for key, value in os.environ.items()
+                   if key not in ("E32_DAEMON_SOCKET", "XDG_RUNTIME_DIR")}
+        with mock.patch.dict(os.environ, environ, clear=True), \
+                mock.patch("e32_daemon.tempfile.gettempdir", return_value=self.tmpdir):
+            path = default_socket_path()
+        directory = os.path.dirname(path)
+        self.assertEqual(os.path.dirname(directory), self.tmpdir)
+        self.assertIsNone(_prepare_socket_directory(path))
+        self.assertEqual(stat.S_IMODE(os.stat(directory).st_mode), 0o700)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,85 @@
+"""
+GPIO backend tests
+"""
+
+import unittest
+from unittest import mock
+
+from e32_configurator import E32Module, FakeGPIOBackend, GPIOBackend
+from e32_simulator import SimulatedE32, SimulatedGPIO
+
+
+class ClosingGPIOBackend(FakeGPIOBackend):
+    """FakeGPIOBackend that counts close() calls"""
+
+    def __init__(self):
+        super().__init__()
+        self.closed = 0
+
+    def close(self):
+        self.closed += 1
+
+
+class GPIOBackendTest(unittest.TestCase):
+    """Incomplete backends fail when created, complete ones work"""
+
+    def test_incomplete_backend_cannot_be_instantiated(self):
+        class NoRead(GPIOBackend):
+            def setup_output(self, pin):
+                pass
+
+            def setup_input(self, pin):
+                pass
+
+            def write(self, pin, level):
+                pass
+
+        with self.assertRaises(TypeError):
+            NoRead()
+
+    def test_fake_backends_are_complete(self):
+        backend = FakeGPIOBackend()
+        backend.setup_output(17)
+        backend.write(17, True)
+        self.assertTrue(backend.read(17))
+        with SimulatedE32() as sim:
+            gpio = SimulatedGPIO(sim)
+            gpio.close()
+
+
+class ModuleGPIOTest(unittest.TestCase):
+    """disconnect() releases the pins of a backend the module created, and only that"""
+
+    def test_created_backend_is_closed_on_disconnect(self):
+        backends = []
+
+        def create(name, chip):
+            backends.append(ClosingGPIOBackend())
+            return backends[-1]
+
+        with SimulatedE32() as sim, mock.patch("e32_configurator.create_gpio_backend", side_effect=create):
+            module = E32Module(port=sim.port, m0_pin=17, m1_pin=27, use_gpio=True, gpio_backend="gpiod")
+            self.assertTrue(module.connect())
+            module.disconnect()
+            self.assertEqual(backends[0].closed, 1)
+            self.assertIsNone(module.gpio)
+
+            # Reconnecting sets the pins up again
+            self.assertTrue(module.connect())
+            self.assertIs(module.gpio, backends[1])
+            self.assertIn(17, backends[1].levels)
+            module.disconnect()
+            self.assertEqual(backends[1].closed, 1)
+
+    def test_given_backend_is_left_open(self):
+        backend = ClosingGPIOBackend()
+        with SimulatedE32() as sim:
+            module = E32Module(port=sim.port, m0_pin=17, m1_pin=27, gpio_backend=backend)
+            self.assertTrue(module.connect())
+            module.disconnect()
+        self.assertEqual(backend.closed, 0)
+        self.assertIs(module.gpio, backend)
+
+
+if __name__ == "__main__":
+    unittest.main()
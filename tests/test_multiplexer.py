@@ -0,0 +1,85 @@
+"""
+ReceiveMultiplexer tests against simulated modules
+"""
+
+import time
+import unittest
+from unittest import mock
+
+from e32_configurator import E32Module, ModuleMode, ReceiveMultiplexer
+from e32_simulator import SimulatedE32
+
+
+class ReceiveMultiplexerTest(unittest.TestCase):
+    """Data from every module is reported, and a lost module does not stop the rest"""
+
+    def setUp(self):
+        self.sims = [SimulatedE32(mode=ModuleMode.NORMAL).start() for _ in range(2)]
+        self.modules = [E32Module(port=sim.port, timeout=0.2) for sim in self.sims]
+        for module in self.modules:
+            self.assertTrue(module.connect())
+        self.lost = []
+        self.multiplexer = ReceiveMultiplexer(self.modules, on_lost=lambda module, reason: self.lost.append(module))
+
+    def tearDown(self):
+        self.multiplexer.close()
+        for module in self.modules:
+            module.disconnect()
+        for sim in self.sims:
+            sim.close()
+
+    def receive(self, length, timeout=2):
+        received = {}
+        deadline = time.monotonic() + timeout
+        while True:
+            for port, timestamp, data in self.multiplexer.poll(timeout=0.1):
+                received[port] = received.get(port, b"") + bytes(data)
+            if sum(map(len, received.values())) >= length or time.monotonic() >= deadline:
+                return received
+
+    def test_receives_from_all_modules(self):
+        self.sims[0].inject(b"first")
+        self.sims[1].inject(b"second")
+        self.assertEqual(self.receive(11), {self.sims[0].port: b"first", self.sims[1].port: b"second"})
+
+    def test_disconnected_module_is_dropped(self):
+        self.receive(0)  # Register both ports with the selector
+        self.modules[0].disconnect()
+        self.multiplexer._next_check = 0.0  # Check the ports on the next poll
+        self.sims[1].inject(b"still here")
+        self.assertEqual(self.receive(10), {self.sims[1].port: b"still here"})
+        self.assertEqual(self.lost, [self.modules[0]])
+        self.assertEqual(list(self.multiplexer._fds), [self.modules[1]])
+
+    def test_module_disconnected_before_first_poll_is_dropped(self):
+        self.modules[0].disconnect()
+        self.sims[1].inject(b"data")
+        self.assertEqual(self.receive(4), {self.sims[1].port: b"data"})
+        self.assertEqual(self.lost, [self.modules[0]])
+
+    def test_unplugged_module_is_dropped(self):
+        self.receive(0)
+        self.sims[0].close()  # Hangs up the port, like an unplugged adapter
+        self.sims[1].inject(b"data")
+        self.assertEqual(self.receive(4), {self.sims[1].port: b"data"})
+        self.receive(0, timeout=0.2)
+        self.assertEqual(self.lost, [self.modules[0]])
+
+    def test_read_error_drops_module(self):
+        self.receive(0)
+        with mock.patch.object(self.modules[0], "read_available", side_effect=OSError(5, "Input/output error")):
+            self.sims[0].inject(b"lost")
+            self.sims[1].inject(b"kept")
+            self.assertEqual(self.receive(4), {self.sims[1].port: b"kept"})
+        self.assertEqual(self.lost, [self.modules[0]])
+
+    def test_remove_after_disconnect_unregisters(self):
+        self.receive(0)
+        fd = self.modules[0]._fd
+        self.modules[0].disconnect()
+        self.multiplexer.remove(self.modules[0])
+        self.assertNotIn(fd, [key.fd for key in self.multiplexer._selector.get_map().values()])
+
+
+if __name__ == "__main__":
+    unittest.main()
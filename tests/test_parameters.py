@@ -0,0 +1,76 @@
+"""
+Parameter write tests against the simulated module
+"""
+
+import asyncio
+import unittest
+
+from e32_async import AsyncE32Module
+from e32_configurator import E32Module
+from e32_simulator import SimulatedE32
+
+
+class VolatileWriteTest(unittest.TestCase):
+    """A C2 write must not make a later persistent write look unchanged"""
+
+    def test_persistent_write_after_volatile_write_is_not_skipped(self):
+        with SimulatedE32() as sim:
+            module = E32Module(port=sim.port, manual_config=True)
+            self.assertTrue(module.connect())
+            try:
+                self.assertTrue(module.set_parameters({"chan": 5}, persist=False))
+                self.assertTrue(module.set_parameters({"chan": 5}, skip_unchanged=True))
+                self.assertFalse(module.last_write_skipped)
+                self.assertEqual(sim.flash_writes, 1)
+                self.assertEqual(sim.saved_registers[3], 5)
+
+                # Saved now, so the same write can be skipped
+                self.assertTrue(module.set_parameters({"chan": 5}, skip_unchanged=True))
+                self.assertTrue(module.last_write_skipped)
+
+                self.assertTrue(module.reset_module())
+                self.assertEqual(module.get_parameters()["chan"], 5)
+            finally:
+                module.disconnect()
+
+    def test_async_persistent_write_after_volatile_write_is_not_skipped(self):
+        async def run(port):
+            async with AsyncE32Module(port, manual_config=True) as module:
+                self.assertTrue(await module.set_parameters({"chan": 5}, persist=False))
+                self.assertTrue(await module.set_parameters({"chan": 5}, skip_unchanged=True))
+                self.assertFalse(module.last_write_skipped)
+
+        with SimulatedE32() as sim:
+            loop = asyncio.new_event_loop()
+            try:
+                loop.run_until_complete(run(sim.port))
+            finally:
+                loop.close()
+            self.assertEqual(sim.flash_writes, 1)
+            self.assertEqual(sim.saved_registers[3], 5)
+
+
+class UnconfirmedWriteTest(unittest.TestCase):
+    """Values from a write the module did not answer are not trusted later"""
+
+    def test_unanswered_write_is_read_back(self):
+        with SimulatedE32() as sim:
+            module = E32Module(port=sim.port, timeout=0.2, manual_config=True)
+            self.assertTrue(module.connect())
+            try:
+                with module.config_session() as ready:
+                    self.assertTrue(ready)
+                    self.assertIsNotNone(module.get_parameters())
+                    sim.drop_responses = 1  # The module never sees the write
+                    self.assertTrue(module.set_parameters({"chan": 5}))
+                    self.assertEqual(sim.registers[3], 23)
+
+                    self.assertTrue(module.set_parameters({"chan": 5}, skip_unchanged=True))
+                    self.assertFalse(module.last_write_skipped)
+                    self.assertEqual(sim.registers[3], 5)
+            finally:
+                module.disconnect()
+
+
+if __name__ == "__main__":
+    unittest.main()
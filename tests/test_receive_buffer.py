@@ -0,0 +1,49 @@
+"""
+ReceiveBuffer tests
+"""
+
+import unittest
+
+from e32_configurator import ReceiveBuffer
+
+
+class ReceiveBufferTest(unittest.TestCase):
+    """Shared views survive the buffer being drained, compacted or cleared"""
+
+    def test_shared_views_are_not_overwritten(self):
+        buffer = ReceiveBuffer(16)
+        views = []
+        expected = []
+        for i in range(40):
+            data = bytes([i]) * (i % 5 + 1)
+            buffer.write(data)
+            if i % 3 == 0:
+                buffer.clear()
+                continue
+            views.append(buffer.take(len(data), share=True))
+            expected.append(data)
+        self.assertEqual([bytes(view) for view in views], expected)
+
+    def test_buffer_is_reused_once_views_are_dropped(self):
+        buffer = ReceiveBuffer(16)
+        backing = buffer._buffer
+        received = bytearray()
+        for i in range(40):
+            buffer.write(bytes([i]) * 3)
+            received += buffer.take(3, share=True)
+        self.assertEqual(received, b"".join(bytes([i]) * 3 for i in range(40)))
+        self.assertIs(buffer._buffer, backing)
+
+    def test_buffer_is_replaced_while_a_view_is_kept(self):
+        buffer = ReceiveBuffer(16)
+        backing = buffer._buffer
+        buffer.write(b"kept")
+        kept = buffer.take(4, share=True)
+        for i in range(10):
+            buffer.write(bytes([i]) * 3)
+            buffer.take(3)
+        self.assertIsNot(buffer._buffer, backing)
+        self.assertEqual(bytes(kept), b"kept")
+
+if __name__ == "__main__":
+    unittest.main()
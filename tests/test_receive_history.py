@@ -0,0 +1,50 @@
+"""
+ReceiveHistory ring buffer tests
+"""
+
+import unittest
+
+from e32_configurator import ReceiveHistory
+
+
+class ReceiveHistoryTest(unittest.TestCase):
+    """The ring keeps the newest max_bytes and lets a reader follow the stream"""
+
+    def test_keeps_newest_bytes_across_wrap(self):
+        history = ReceiveHistory(10)
+        received = bytearray()
+        for i in range(50):
+            chunk = bytes([i]) * (i % 4 + 1)
+            history.append(chunk)
+            received += chunk
+            self.assertEqual(history.getvalue(), bytes(received[-10:]))
+        self.assertEqual(history.dropped_bytes, len(received) - 10)
+
+    def test_chunk_larger_than_ring(self):
+        history = ReceiveHistory(8)
+        history.append(b"abc")
+        history.append(bytes(range(20)))
+        self.assertEqual(history.getvalue(), bytes(range(12, 20)))
+
+    def test_read_from_follows_the_stream(self):
+        history = ReceiveHistory(16)
+        history.append(b"hello ")
+        data, position = history.read_from(0)
+        self.assertEqual(data, b"hello ")
+        history.append(memoryview(b"world"))
+        data, position = history.read_from(position)
+        self.assertEqual(data, b"world")
+        self.assertEqual(history.read_from(position), (b"", position))
+
+        # A reader that fell behind gets what is still kept
+        history.append(b"x" * 20)
+        data, position = history.read_from(position)
+        self.assertEqual(data, b"x" * 16)
+
+        history.clear()
+        history.append(b"new")
+        self.assertEqual(history.read_from(position)[0], b"new")
+
+
+if __name__ == "__main__":
+    unittest.main()
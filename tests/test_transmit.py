@@ -0,0 +1,48 @@
+"""
+Transmit queue tests against the simulated module
+"""
+
+import io
+import unittest
+from unittest import mock
+
+import serial
+
+from e32_configurator import E32Module, ModuleMode
+from e32_simulator import SimulatedE32
+
+
+class TransmitErrorTest(unittest.TestCase):
+    """A write error ends the transmit worker cleanly and is reported"""
+
+    def setUp(self):
+        self.sim = SimulatedE32(mode=ModuleMode.NORMAL).start()
+        self.module = E32Module(port=self.sim.port, timeout=0.2)
+        self.assertTrue(self.module.connect())
+        self.module.current_mode = ModuleMode.NORMAL
+
+    def tearDown(self):
+        self.module.disconnect()
+        self.sim.close()
+
+    def test_write_error_fails_send_stream(self):
+        payload = bytes(range(256)) * 4
+        with mock.patch.object(self.module.serial, "write", side_effect=serial.SerialException("device gone")):
+            with self.assertRaises(IOError):
+                self.module.send_stream(io.BytesIO(payload), air_data_rate=19200)
+        self.assertEqual(self.module.tx_pending, 0)
+        self.assertIsNone(self.module._tx_thread)
+
+        # The next queue_data starts a new worker
+        self.assertEqual(self.module.queue_data(b"hello", air_data_rate=19200), 5)
+        self.assertTrue(self.module.wait_transmitted(timeout=2))
+
+    def test_write_error_fails_wait_transmitted(self):
+        with mock.patch.object(self.module.serial, "write", side_effect=OSError(5, "Input/output error")):
+            self.module.queue_data(b"data", air_data_rate=19200)
+            self.assertFalse(self.module.wait_transmitted(timeout=2))
+        self.assertEqual(self.module.tx_pending, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()